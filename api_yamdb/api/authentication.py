@@ -0,0 +1,50 @@
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from users.models import User
+from .cache import request_versions, user_cache
+
+AUTH_FIELDS = tuple(
+    field.attname for field in User._meta.concrete_fields
+    if field.attname in ('id', 'username', 'role', 'is_superuser',
+                         'is_staff', 'is_active')
+)
+
+
+def user_version_name(user_id):
+    return f'user:{user_id}'
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация с кэшем полей пользователя, нужных для прав.
+
+    Запись кэша сверяется с версией пользователя, которую увеличивают
+    сигналы сохранения и удаления, а TTL ограничивает срок ее жизни.
+    Версии хранятся в БД, поэтому смена роли или блокировка в любом
+    процессе действует сразу во всех. Версия пользователя читается
+    одним запросом с версиями, нужными представлению для ETag и кэша
+    списков, поэтому попадание в кэш не добавляет запросов. Остальные
+    поля пользователя загружаются лениво при обращении.
+    """
+
+    def authenticate(self, request):
+        self.request = request
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+        view = self.request.parser_context.get('view')
+        names = getattr(view, 'get_request_versions', tuple)()
+        version, *_ = request_versions(
+            self.request, (user_version_name(user_id), *names))
+        cached = user_cache.get(user_id)
+        if cached is not None and cached[0] == version:
+            return User.from_db(DEFAULT_DB_ALIAS, AUTH_FIELDS, cached[1])
+        user = super().get_user(validated_token)
+        user_cache.set(user_id, (
+            version, tuple(getattr(user, name) for name in AUTH_FIELDS)
+        ))
+        return user
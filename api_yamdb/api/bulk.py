@@ -0,0 +1,133 @@
+"""Массовое создание произведений.
+
+Элементы проверяются сериализатором без запросов к БД, slug жанров и
+категорий всего пакета разрешаются одним запросом на таблицу, а
+произведения и связи с жанрами вставляются bulk_create в одной
+транзакции. bulk_create не отправляет сигналы, поэтому счетчики
+фасетов, журнал изменений и версии кэшей обновляются здесь.
+"""
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Max
+from rest_framework.relations import SlugRelatedField
+
+from reviews.changelog import record
+from reviews.facets import count_created
+from reviews.models import Category, ChangeLog, Genre, Title
+from reviews.versions import TITLES, bump_version
+from .serializers import TitleBulkItemSerializer
+
+DOES_NOT_EXIST = SlugRelatedField.default_error_messages['does_not_exist']
+
+
+def slug_ids(model, slugs):
+    """Отображение slug -> id для всех `slugs` одним запросом."""
+    return dict(model.objects.filter(slug__in=slugs).order_by()
+                .values_list('slug', 'id'))
+
+
+def missing_slug_errors(slugs):
+    return [DOES_NOT_EXIST.format(slug_name='slug', value=slug)
+            for slug in slugs]
+
+
+def validate_items(items, errors):
+    """Возвращает пары (номер, данные) корректных элементов."""
+    valid = []
+    for index, item in enumerate(items):
+        serializer = TitleBulkItemSerializer(data=item)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            errors[index] = serializer.errors
+    return valid
+
+
+def resolve_slugs(valid, errors):
+    """Строит произведения и id их жанров по slug из пакета."""
+    genres = slug_ids(Genre, {
+        slug for _, data in valid for slug in data['genre']})
+    categories = slug_ids(Category, {data['category'] for _, data in valid})
+    resolved = []
+    for index, data in valid:
+        item_errors = {}
+        missing = [slug for slug in data['genre'] if slug not in genres]
+        if missing:
+            item_errors['genre'] = missing_slug_errors(missing)
+        if data['category'] not in categories:
+            item_errors['category'] = missing_slug_errors(
+                [data['category']])
+        if item_errors:
+            errors[index] = item_errors
+            continue
+        title = Title(
+            name=data['name'], year=data['year'],
+            description=data.get('description', ''),
+            category_id=categories[data['category']],
+        )
+        resolved.append(
+            (index, title, sorted({genres[slug] for slug in data['genre']})))
+    return resolved
+
+
+MATCH_FIELDS = ('name', 'year', 'description', 'category_id')
+
+
+def assign_ids(titles, after):
+    """Назначает произведениям id их строк, вставленных после `after`.
+
+    Строки сопоставляются с произведениями по значениям полей в порядке
+    id: вставки других транзакций могут чередоваться с нашими.
+    """
+    pending = defaultdict(list)
+    for title in titles:
+        pending[tuple(getattr(title, name) for name in MATCH_FIELDS)].append(
+            title)
+    rows = Title.objects.filter(id__gt=after).order_by('id').values_list(
+        'id', *MATCH_FIELDS)
+    for pk, *values in rows:
+        waiting = pending.get(tuple(values))
+        if waiting:
+            waiting.pop(0).pk = pk
+
+
+@transaction.atomic
+def insert_titles(titles, genre_ids):
+    """Вставляет произведения и их связи с жанрами."""
+    if connection.features.can_return_ids_from_bulk_insert:
+        Title.objects.bulk_create(titles)
+    elif connection.vendor == 'sqlite':
+        Title.objects.bulk_create(titles)
+        # SQLite не возвращает id из bulk_create. Транзакция держит
+        # блокировку записи всей БД, поэтому вставленные строки получили
+        # последовательные id, заканчивающиеся максимальным.
+        last = Title.objects.aggregate(last=Max('id'))['last']
+        for pk, title in enumerate(titles, last - len(titles) + 1):
+            title.pk = pk
+    else:
+        after = Title.objects.aggregate(last=Max('id'))['last'] or 0
+        Title.objects.bulk_create(titles)
+        assign_ids(titles, after)
+    links = [
+        Title.genre.through(title_id=title.pk, genre_id=genre_id)
+        for title, ids in zip(titles, genre_ids) for genre_id in ids
+    ]
+    Title.genre.through.objects.bulk_create(links)
+    count_created(titles, links)
+    record(Title, ChangeLog.CREATED, *(title.pk for title in titles))
+
+
+def create_titles(items):
+    """Создает корректные элементы пакета.
+
+    Возвращает созданные произведения с номерами элементов и ошибки
+    остальных элементов по номерам.
+    """
+    errors = {}
+    resolved = resolve_slugs(validate_items(items, errors), errors)
+    if resolved:
+        insert_titles([title for _, title, _ in resolved],
+                      [ids for _, _, ids in resolved])
+        bump_version(TITLES)
+    return [(index, title) for index, title, _ in resolved], errors
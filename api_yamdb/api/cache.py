@@ -0,0 +1,89 @@
+"""Локальные кэши процесса с инвалидацией по версиям коллекций."""
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+
+from reviews.versions import get_versions
+
+
+class LocalCache:
+    """Ограниченный LRU-кэш в памяти процесса с необязательным TTL.
+
+    Ключи кэшируемых данных содержат версию коллекции, поэтому после
+    ее увеличения (в любом процессе) старые записи перестают находиться
+    и со временем вытесняются.
+    """
+
+    def __init__(self, maxsize=256, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.ttl is not None:
+                if entry[0] < time.monotonic():
+                    del self.entries[key]
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, data):
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self.lock:
+            self.entries[key] = (expires, data)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self.entries), 'maxsize': self.maxsize}
+
+
+response_cache = LocalCache()
+user_cache = LocalCache(settings.AUTH_USER_CACHE_SIZE,
+                        settings.AUTH_USER_CACHE_TTL)
+
+
+def list_cache_key(request, collection):
+    """Ключ списка: коллекция, ее версия, хост и параметры запроса."""
+    params = tuple((name, tuple(values))
+                   for name, values in sorted(request.query_params.lists()))
+    version, = request_versions(request, (collection,))
+    return (collection, version, request.get_host(), params)
+
+
+def request_versions(request, names):
+    """Версии коллекций `names`, прочитанные не больше раза за запрос.
+
+    Аутентификация читает версию пользователя одним запросом вместе
+    с версиями, нужными представлению (`get_request_versions()`),
+    следующие чтения за запрос берут их из запроса.
+    """
+    known = getattr(request, '_collection_versions', None)
+    if known is None:
+        known = request._collection_versions = {}
+    missing = [name for name in names if name not in known]
+    if missing:
+        known.update(zip(missing, get_versions(*missing)))
+    return tuple(known[name] for name in names)
@@ -0,0 +1,105 @@
+"""Потоковая выгрузка произведений и отзывов в NDJSON и CSV.
+
+Строки читаются пачками по EXPORT_BATCH_SIZE условием по id, а не
+OFFSET, и сразу отдаются клиенту, поэтому память не зависит от размера
+выгрузки. Пачки читаются разными запросами: изменения во время
+выгрузки могут попасть в нее частично.
+"""
+import csv
+from io import StringIO
+
+from django.conf import settings
+
+from reviews.models import Review, Title
+from .renderers import dumps
+from .representations import TITLE_FIELDS, represent_titles, title_values
+
+NDJSON = 'ndjson'
+CSV = 'csv'
+CONTENT_TYPES = {
+    NDJSON: 'application/x-ndjson',
+    CSV: 'text/csv; charset=utf-8',
+}
+REVIEW_COLUMNS = {
+    'id': 'id',
+    'title': 'title_id',
+    'text': 'text',
+    'author': 'author__username',
+    'score': 'score',
+    'pub_date': 'pub_date',
+}
+
+
+def batches(rows, size):
+    """Строки `.values()` пачками по `size` в порядке id."""
+    last = 0
+    while True:
+        batch = list(rows.filter(id__gt=last).order_by('id')[:size])
+        if batch:
+            yield batch
+        if len(batch) < size:
+            return
+        last = batch[-1]['id']
+
+
+def title_items(size):
+    for batch in batches(title_values(Title.objects.all()), size):
+        yield represent_titles(batch)
+
+
+def review_items(size):
+    rows = Review.objects.values(*REVIEW_COLUMNS.values())
+    for batch in batches(rows, size):
+        yield [{name: row[column] for name, column in REVIEW_COLUMNS.items()}
+               for row in batch]
+
+
+def flat_title(item):
+    """Строка CSV произведения: жанры и категория - по slug."""
+    return {
+        **item,
+        'genre': ','.join(genre['slug'] for genre in item['genre']),
+        'category': item['category'] and item['category']['slug'],
+    }
+
+
+def flat_review(item):
+    return {**item, 'pub_date': item['pub_date'].isoformat()}
+
+
+DATASETS = {
+    'titles': (title_items, flat_title, TITLE_FIELDS),
+    'reviews': (review_items, flat_review, tuple(REVIEW_COLUMNS)),
+}
+
+
+def ndjson_chunks(item_batches):
+    for items in item_batches:
+        yield b''.join(dumps(item) + b'\n' for item in items)
+
+
+def drain(buffer):
+    """Забирает накопленный в буфере текст и очищает буфер."""
+    data = buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+def csv_chunks(item_batches, flatten, columns):
+    buffer = StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+    writer.writeheader()
+    yield drain(buffer)
+    for items in item_batches:
+        writer.writerows(flatten(item) for item in items)
+        yield drain(buffer)
+
+
+def export_chunks(dataset, output):
+    """Части выгрузки набора `dataset` в формате `output`."""
+    items, flatten, columns = DATASETS[dataset]
+    item_batches = items(settings.EXPORT_BATCH_SIZE)
+    if output == CSV:
+        return csv_chunks(item_batches, flatten, columns)
+    return ndjson_chunks(item_batches)
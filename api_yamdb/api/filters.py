@@ -1,10 +1,14 @@
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast, NullIf
 from django_filters.rest_framework import CharFilter, FilterSet, NumberFilter
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
 
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class TitleFilter(FilterSet):
-    name = CharFilter(field_name='name', lookup_expr='icontains')
+    name = CharFilter(method='filter_name')
     category = CharFilter(field_name='category__slug')
     genre = CharFilter(field_name='genre__slug')
     year = NumberFilter(field_name='year')
@@ -12,3 +16,45 @@ class TitleFilter(FilterSet):
     class Meta:
         model = Title
         fields = ('name', 'category', 'genre', 'year',)
+
+    def filter_name(self, queryset, name, value):
+        """Поиск по началу слов названия через полнотекстовый индекс."""
+        return search_titles(queryset, value, column='name')
+
+
+class TitleSearchFilter(BaseFilterBackend):
+    """Полнотекстовый поиск произведений по названию и описанию (?q=)."""
+    search_param = 'q'
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        if not text:
+            return queryset
+        return search_titles(queryset, text)
+
+
+class TitleOrderingFilter(OrderingFilter):
+    """Сортировка произведений, в том числе по средней оценке (rating).
+
+    Средняя оценка - свойство модели, поэтому для сортировки она
+    вычисляется выражением по хранимым агрегатам.
+    """
+    rating_field = 'rating'
+    rating = Cast('rating_sum', FloatField()) / NullIf(F('rating_count'), 0)
+
+    def get_default_valid_fields(self, queryset, view, context={}):
+        fields = super().get_default_valid_fields(queryset, view, context)
+        return [*fields, (self.rating_field, self.rating_field)]
+
+    def order_term(self, term):
+        if term.lstrip('-') != self.rating_field:
+            return term
+        if term.startswith('-'):
+            return self.rating.desc()
+        return self.rating.asc()
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if ordering:
+            return queryset.order_by(*map(self.order_term, ordering))
+        return queryset
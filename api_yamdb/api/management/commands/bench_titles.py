@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import FastJSONRenderer
+from api.representations import represent_titles, title_values
+from api.serializers import TitleSerializer
+from reviews.models import Category, Genre, Title
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает скорость представления списка произведений '
+            '(TitleSerializer и быстрый путь из строк .values()) и его '
+            'рендеринга в JSON (JSONRenderer и FastJSONRenderer). '
+            'Тестовые данные создаются в транзакции и откатываются.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000,
+                            help='Количество создаваемых произведений.')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Количество повторов, берется лучший.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.create_titles(options['rows'])
+            queryset = Title.objects.select_related(
+                'category').prefetch_related('genre')
+            self.report('TitleSerializer', options['repeat'], lambda: (
+                TitleSerializer(queryset.all(), many=True).data
+            ))
+            self.report('represent_titles', options['repeat'], lambda: (
+                represent_titles(title_values(queryset.all()))
+            ))
+            page = {'count': options['rows'], 'next': None,
+                    'previous': None,
+                    'results': represent_titles(title_values(queryset))}
+            for renderer in (JSONRenderer(), FastJSONRenderer()):
+                self.report(type(renderer).__name__, options['repeat'],
+                            lambda: renderer.render(page),
+                            rows=options['rows'])
+            transaction.set_rollback(True)
+
+    def create_titles(self, rows):
+        category = Category.objects.create(name='Бенчмарк', slug='bench')
+        Genre.objects.bulk_create(
+            Genre(name=f'Жанр {i}', slug=f'bench-{i}') for i in range(3))
+        genres = list(Genre.objects.filter(slug__startswith='bench-'))
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {i}', year=2000,
+                  description='Описание ' * 20, category=category,
+                  rating_sum=i % 50, rating_count=i % 7)
+            for i in range(rows)
+        )
+        Title.genre.through.objects.bulk_create(
+            Title.genre.through(title_id=title_id, genre_id=genre.id)
+            for title_id in Title.objects.values_list('id', flat=True)
+            for genre in genres[:2]
+        )
+
+    def report(self, name, repeat, build, rows=None):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = build()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        rows = len(result) if rows is None else rows
+        self.stdout.write(f'{name}: {rows} строк, {best:.3f} с, '
+                          f'{rows / best:.0f} строк/с')
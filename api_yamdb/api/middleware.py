@@ -0,0 +1,143 @@
+import re
+
+from django.conf import settings
+from django.utils.cache import (cc_delim_re, patch_vary_headers,
+                                set_response_etag)
+from django.utils.text import compress_string
+
+from .cache import LocalCache
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+ACCEPT_ENCODING_RE = re.compile(r'^\s*([\w*-]+)\s*(?:;\s*q=([\d.]+))?\s*$')
+
+compressed_cache = LocalCache(settings.COMPRESSION_CACHE_SIZE)
+
+
+def compression_exempt(view_func):
+    """Отключает сжатие ответов представления (например, с секретами)."""
+    view_func.compression_exempt = True
+    return view_func
+
+
+def accepted_encodings(request):
+    """Кодировки из Accept-Encoding, которые клиент готов принять."""
+    accepted = set()
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        match = ACCEPT_ENCODING_RE.match(part)
+        if match is None:
+            continue
+        name, quality = match.groups()
+        try:
+            if quality is not None and float(quality) <= 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(name.lower())
+    return accepted
+
+
+def choose_encoding(request):
+    accepted = accepted_encodings(request)
+    if brotli is not None and ('br' in accepted or '*' in accepted):
+        return 'br'
+    if 'gzip' in accepted or '*' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(
+            content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return compress_string(content)
+
+
+def is_cacheable(request, response):
+    cache_control = response.get('Cache-Control', '')
+    return (request.method in ('GET', 'HEAD')
+            and 'no-store' not in cache_control
+            and 'private' not in cache_control)
+
+
+def varying_values(request, response):
+    """Значения заголовков запроса, перечисленных в Vary ответа.
+
+    ETag ответа может не учитывать эти заголовки (например,
+    Authorization у ConditionalGetMixin), поэтому они входят в ключ
+    кэша сжатых тел. Для `Vary: *` возвращает None: ответ не кэшируется.
+    """
+    if not response.has_header('Vary'):
+        return ()
+    # Выбранная кодировка уже входит в ключ.
+    headers = sorted({header.strip().lower() for header
+                      in cc_delim_re.split(response['Vary'])}
+                     - {'accept-encoding'})
+    if '*' in headers:
+        return None
+    return tuple(
+        request.META.get('HTTP_' + header.upper().replace('-', '_'))
+        for header in headers
+    )
+
+
+class CompressionMiddleware:
+    """Сжимает ответы (brotli или gzip) по заголовку Accept-Encoding.
+
+    Для кэшируемых GET-ответов сжатое тело хранится в локальном кэше по
+    ETag ответа и заголовкам запроса из Vary, поэтому одно и то же тело
+    сжимается один раз. Короче COMPRESSION_MIN_SIZE байт ответы не
+    сжимаются; представления отключают сжатие декоратором
+    `compression_exempt` или атрибутом класса `compression_exempt = True`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if getattr(request, '_compression_exempt', False):
+            return response
+        return self.process_response(request, response)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'cls', None)
+        request._compression_exempt = (
+            getattr(view_func, 'compression_exempt', False)
+            or getattr(view_class, 'compression_exempt', False)
+        )
+
+    def process_response(self, request, response):
+        if (response.streaming or response.status_code != 200
+                or response.has_header('Content-Encoding')
+                or len(response.content) < settings.COMPRESSION_MIN_SIZE):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request)
+        if encoding is None:
+            return response
+        varying = varying_values(request, response)
+        if varying is not None and is_cacheable(request, response):
+            if not response.has_header('ETag'):
+                set_response_etag(response)
+            key = (encoding, request.get_full_path(), response['ETag'],
+                   varying)
+            content = compressed_cache.get(key)
+            if content is None:
+                content = compress(response.content, encoding)
+                compressed_cache.set(key, content)
+        else:
+            content = compress(response.content, encoding)
+        if len(content) >= len(response.content):
+            return response
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            # Сжатое тело отличается от исходного: ETag становится слабым.
+            response['ETag'] = 'W/' + etag
+        return response
@@ -1,9 +1,134 @@
-from rest_framework import filters, mixins, viewsets
+import hashlib
 
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import filters, mixins, status, viewsets
+from rest_framework.response import Response
+
+from reviews.versions import BULK
+from .cache import list_cache_key, request_versions, response_cache
 from .permissions import IsAdminOrReadOnly
+from .serializers import requested_fields
+
+
+class CachedListMixin:
+    """Отдает список из локального кэша, пока версия коллекции не изменилась.
+
+    Коллекция называется по модели queryset, версию увеличивают
+    сигналы сохранения и удаления объектов.
+    """
+
+    def get_request_versions(self):
+        return (self.queryset.model._meta.model_name,)
+
+    def list(self, request, *args, **kwargs):
+        key = list_cache_key(request, self.queryset.model._meta.model_name)
+        data = response_cache.get(key)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+        response = super().list(request, *args, **kwargs)
+        response_cache.set(key, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+def etag_matches(request, etag):
+    """Слабое сравнение ETag с заголовком If-None-Match."""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    candidates = parse_etags(header)
+    return '*' in candidates or etag in (
+        candidate[2:] if candidate.startswith('W/') else candidate
+        for candidate in candidates
+    )
+
+
+class ConditionalGetMixin:
+    """ETag по версиям данных и ответ 304 Not Modified для чтения.
+
+    ETag строится из версий `get_etag_versions()`, пути с параметрами
+    и заголовка Accept, поэтому проверка If-None-Match не обращается
+    к БД и не сериализует данные. Версии читаются до выборки: если
+    данные изменятся во время запроса, клиент получит новое тело при
+    следующей проверке.
+    """
+
+    def get_etag_versions(self):
+        raise NotImplementedError
+
+    def get_request_versions(self):
+        return (BULK, *self.get_etag_versions())
+
+    def url_id(self, name):
+        """id из URL в виде, в котором его использует сигнал (05 -> 5)."""
+        value = self.kwargs.get(name)
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return value
+
+    def get_etag(self, request):
+        versions = request_versions(request, self.get_request_versions())
+        raw = '|'.join((request.get_full_path(),
+                        request.META.get('HTTP_ACCEPT', ''),
+                        *map(str, versions)))
+        return '"{}"'.format(hashlib.md5(raw.encode()).hexdigest())
+
+    def conditional(self, handler, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        if etag_matches(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (status.HTTP_200_OK,
+                                    status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+        patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+
+class SparseQuerysetMixin:
+    """Загружает из БД только колонки полей, запрошенных в ?fields=.
+
+    `sparse_columns` задает колонки для полей ответа, не совпадающих
+    с полями модели, `sparse_related` и `sparse_prefetch` - связи,
+    которые нужны только для соответствующих полей.
+    """
+    sparse_columns = {}
+    sparse_related = {}
+    sparse_prefetch = {}
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = requested_fields(self.request)
+        known = set(self.get_serializer_class().Meta.fields)
+        if not fields or not fields & known:
+            return queryset
+        fields &= known
+        columns = {'id'}
+        for name in fields:
+            columns.update(self.sparse_columns.get(name, (name,)))
+        queryset = queryset.select_related(None).prefetch_related(None)
+        related = [self.sparse_related[name] for name in fields
+                   if name in self.sparse_related]
+        if related:
+            queryset = queryset.select_related(*related)
+        prefetch = [self.sparse_prefetch[name] for name in fields
+                    if name in self.sparse_prefetch]
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset.only(*columns)
 
 
-class AdminViewSet(mixins.CreateModelMixin,
+class AdminViewSet(CachedListMixin,
+                   mixins.CreateModelMixin,
                    mixins.ListModelMixin,
                    mixins.DestroyModelMixin,
                    viewsets.GenericViewSet):
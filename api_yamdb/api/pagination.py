@@ -0,0 +1,100 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Курсорная пагинация по (pub_date, id).
+
+    Следующая страница выбирается условием по ключу сортировки, а не
+    OFFSET, и без COUNT(*), поэтому стоимость страницы не зависит от
+    ее номера. Запросы используют составные индексы
+    (родитель, pub_date, id).
+    """
+    cursor_query_param = 'cursor'
+    page_number_query_param = 'page'
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def __init__(self, page_size):
+        self.page_size = page_size
+
+    def encode_cursor(self, obj):
+        raw = f'{obj.pub_date.isoformat()}|{obj.pk}'
+        return urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            pub_date, pk = (urlsafe_b64decode(encoded.encode())
+                            .decode().split('|'))
+            position = parse_datetime(pub_date), int(pk)
+        except (BinasciiError, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if position[0] is None:
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        queryset = queryset.order_by('pub_date', 'id')
+        position = self.decode_cursor(request)
+        if position is not None:
+            pub_date, pk = position
+            queryset = queryset.filter(pub_date__gte=pub_date).exclude(
+                pub_date=pub_date, id__lte=pk)
+        page = list(queryset[:self.page_size + 1])
+        self.has_next = len(page) > self.page_size
+        page = page[:self.page_size]
+        self.last = page[-1] if page else None
+        return page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(),
+                                 self.page_number_query_param)
+        return replace_query_param(url, self.cursor_query_param,
+                                   self.encode_cursor(self.last))
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def link_after(self, request, path, obj):
+        """Ссылка на страницу `path`, следующую за объектом `obj`."""
+        return replace_query_param(request.build_absolute_uri(path),
+                                   self.cursor_query_param,
+                                   self.encode_cursor(obj))
+
+
+class ReviewCommentPagination(PageNumberPagination):
+    """Постраничная пагинация с опциональным курсорным режимом.
+
+    Курсорный режим включается параметром `?pagination=cursor`
+    или наличием параметра `cursor`.
+    """
+    mode_query_param = 'pagination'
+    keyset = None
+
+    def use_keyset(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or KeysetPagination.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_keyset(request):
+            self.keyset = KeysetPagination(self.page_size)
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
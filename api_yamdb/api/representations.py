@@ -0,0 +1,161 @@
+"""Быстрое представление произведений без механизма полей DRF.
+
+Ответы для чтения строятся из строк `.values()` и кортежей жанров.
+Результат совпадает с выводом TitleSerializer, что проверяется тестами.
+"""
+from collections import defaultdict
+
+from reviews.models import (SCORES, Category, Genre, Review, Title,
+                            TitleFacet, score_field)
+from .serializers import ReviewSerializer
+
+TITLE_FIELDS = ('id', 'name', 'year', 'rating', 'description',
+                'genre', 'category')
+TITLE_DETAIL_FIELDS = TITLE_FIELDS + ('scores',)
+TITLE_COLUMNS = {
+    'id': ('id',),
+    'name': ('name',),
+    'year': ('year',),
+    'rating': ('rating_sum', 'rating_count'),
+    'description': ('description',),
+    'genre': (),
+    'category': ('category__name', 'category__slug'),
+    'scores': tuple(score_field(score) for score in SCORES),
+}
+
+
+def title_fields(requested=None, available=TITLE_FIELDS):
+    """Поля ответа в порядке TitleSerializer с учетом ?fields=."""
+    if requested and requested & set(available):
+        return tuple(name for name in available if name in requested)
+    return available
+
+
+def title_values(queryset, fields=TITLE_FIELDS):
+    """Queryset строк со столбцами, нужными для полей `fields`."""
+    columns = ['id']
+    for name in fields:
+        columns.extend(column for column in TITLE_COLUMNS[name]
+                       if column not in columns)
+    return queryset.prefetch_related(None).values(*columns)
+
+
+def genres_by_title(title_ids):
+    """Жанры произведений в порядке сортировки модели Genre."""
+    genres = defaultdict(list)
+    rows = (Title.genre.through.objects.filter(title_id__in=title_ids)
+            .order_by('genre__name')
+            .values_list('title_id', 'genre__name', 'genre__slug'))
+    for title_id, name, slug in rows:
+        genres[title_id].append({'name': name, 'slug': slug})
+    return genres
+
+
+def represent_titles(rows, fields=TITLE_FIELDS):
+    """Строит представления произведений из строк `title_values()`."""
+    rows = list(rows)
+    genres = genres_by_title([row['id'] for row in rows]) if (
+        'genre' in fields) else {}
+    result = []
+    for row in rows:
+        data = {}
+        for name in fields:
+            if name == 'rating':
+                count = row['rating_count']
+                data[name] = (int(row['rating_sum'] / count)
+                              if count else None)
+            elif name == 'genre':
+                data[name] = genres.get(row['id'], [])
+            elif name == 'scores':
+                data[name] = {str(score): row[score_field(score)]
+                              for score in SCORES}
+            elif name == 'category':
+                data[name] = (None if row['category__slug'] is None else {
+                    'name': row['category__name'],
+                    'slug': row['category__slug'],
+                })
+            else:
+                data[name] = row[name]
+        result.append(data)
+    return result
+
+
+def represent_leaderboard(items, fields=TITLE_FIELDS):
+    """Произведения рейтинга лучших в его порядке с полем `score`.
+
+    `items` - пары (id, байесовское среднее) из reviews.leaderboard.
+    """
+    rows = {row['id']: row for row in title_values(
+        Title.objects.filter(id__in=[pk for pk, _ in items]), fields)}
+    ranked = [(rows[pk], score) for pk, score in items if pk in rows]
+    result = represent_titles([row for row, _ in ranked], fields)
+    for data, (_, score) in zip(result, ranked):
+        data['score'] = round(score, 2)
+    return result
+
+
+def represent_facets(counts):
+    """Фасеты для ответа: жанры и категории с названием и slug.
+
+    Значения упорядочены по убыванию количества произведений.
+    """
+    result = {}
+    for kind, values in counts.items():
+        if kind == TitleFacet.YEAR:
+            items = [{'value': year, 'count': count}
+                     for year, count in sorted(values.items())]
+        else:
+            model = Genre if kind == TitleFacet.GENRE else Category
+            rows = (model.objects.filter(id__in=list(values))
+                    .values_list('id', 'name', 'slug'))
+            items = [{'name': name, 'slug': slug, 'count': values[pk]}
+                     for pk, name, slug in rows]
+        result[kind] = sorted(items, key=lambda item: -item['count'])
+    return result
+
+
+def _catalog_objects(model, ids):
+    return {row.pop('id'): row for row in
+            model.objects.filter(id__in=ids).values('id', 'name', 'slug')}
+
+
+def _title_objects(ids):
+    rows = list(title_values(Title.objects.filter(id__in=ids)))
+    return dict(zip((row['id'] for row in rows), represent_titles(rows)))
+
+
+def _review_objects(ids):
+    reviews = list(Review.objects.filter(id__in=ids).select_related('author'))
+    result = {}
+    for review, data in zip(reviews,
+                            ReviewSerializer(reviews, many=True).data):
+        data['title'] = review.title_id
+        result[review.pk] = data
+    return result
+
+
+CHANGE_LOADERS = {
+    Title._meta.model_name: _title_objects,
+    Genre._meta.model_name: lambda ids: _catalog_objects(Genre, ids),
+    Category._meta.model_name: lambda ids: _catalog_objects(Category, ids),
+    Review._meta.model_name: _review_objects,
+}
+
+
+def represent_changes(entries):
+    """Записи журнала с текущим состоянием объектов.
+
+    Объекты каждой модели загружаются одним запросом; для удаленных
+    объектов `data` равно None.
+    """
+    ids = defaultdict(list)
+    for entry in entries:
+        ids[entry.model].append(entry.object_id)
+    objects = {model: CHANGE_LOADERS[model](model_ids)
+               for model, model_ids in ids.items()}
+    return [{
+        'model': entry.model,
+        'id': entry.object_id,
+        'action': entry.action,
+        'data': objects[entry.model].get(entry.object_id),
+    } for entry in entries]
@@ -2,13 +2,42 @@ import datetime as dt
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from rest_framework import serializers
+from django.db import IntegrityError, transaction
+from rest_framework import permissions, serializers
+from rest_framework.settings import api_settings
 
 from reviews.models import Category, Comments, Genre, Review, Title
 from users.models import User
 from users.validators import username_me
 
 
+FIELDS_QUERY_PARAM = 'fields'
+
+
+def requested_fields(request):
+    """Поля из параметра ?fields= для запросов на чтение или None."""
+    if request is None or request.method not in permissions.SAFE_METHODS:
+        return None
+    value = request.query_params.get(FIELDS_QUERY_PARAM)
+    if not value:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class SparseFieldsMixin:
+    """Оставляет в ответе только поля, перечисленные в ?fields=.
+
+    Неизвестные поля игнорируются; если известных нет, выводятся все.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = requested_fields(self.context.get('request'))
+        if fields and fields & set(self.fields):
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
+
+
 class SignUpSerializer(serializers.Serializer):
     """Serializer для входа"""
     username = serializers.RegexField(max_length=settings.LIMIT_USERNAME,
@@ -91,7 +120,7 @@ class GenreSerializer(serializers.ModelSerializer):
         fields = ('name', 'slug')
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer для произведений."""
     genre = GenreSerializer(many=True)
     category = CategorySerializer()
@@ -107,6 +136,16 @@ class TitleSerializer(serializers.ModelSerializer):
                             )
 
 
+class TitleDetailSerializer(TitleSerializer):
+    """Serializer для страницы произведения с распределением оценок."""
+    scores = serializers.DictField(child=serializers.IntegerField(),
+                                   read_only=True)
+
+    class Meta(TitleSerializer.Meta):
+        fields = TitleSerializer.Meta.fields + ('scores',)
+        read_only_fields = fields
+
+
 class TitlePostSerialzier(serializers.ModelSerializer):
     """Serializer для произведений (POST запросы)."""
     genre = serializers.SlugRelatedField(
@@ -118,7 +157,7 @@ class TitlePostSerialzier(serializers.ModelSerializer):
         slug_field='slug',
         queryset=Category.objects.all()
     )
-    rating = serializers.IntegerField(required=False)
+    rating = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Title
@@ -139,7 +178,20 @@ class TitlePostSerialzier(serializers.ModelSerializer):
         return TitleSerializer(instance).data
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class TitleBulkItemSerializer(TitlePostSerialzier):
+    """Serializer элемента массового создания произведений.
+
+    Slug жанров и категорий проверяются не здесь, а одним запросом
+    на таблицу для всего пакета (api.bulk).
+    """
+    genre = serializers.ListField(child=serializers.SlugField())
+    category = serializers.SlugField()
+
+    class Meta(TitlePostSerialzier.Meta):
+        fields = ('name', 'year', 'description', 'genre', 'category')
+
+
+class ReviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer для отзывов и оценок."""
     author = serializers.SlugRelatedField(
         read_only=True,
@@ -153,29 +205,32 @@ class ReviewSerializer(serializers.ModelSerializer):
             )
         return score
 
-    def validate(self, data):
-        """Валидация для отзывов и оценок"""
-        if self.context['request'].method != 'POST':
-            return data
-
-        author = self.context['request'].user
-        title_id = (self.context['request'].
-                    parser_context['kwargs']['title_id']
-                    )
-
-        if Review.objects.filter(
-                author=author, title=title_id).exists():
-            raise serializers.ValidationError(
-                'Может существовать только один отзыв!'
-            )
-        return data
+    def create(self, validated_data):
+        """Создает отзыв; повтор ловится уникальным ограничением в БД.
+
+        Остальные ошибки целостности (например, произведение удалено
+        параллельным запросом) не выдаются за повтор отзыва.
+        """
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                    author=validated_data['author'],
+                    title=validated_data['title']).exists():
+                raise
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Может существовать только один отзыв!'
+                ]
+            })
 
     class Meta:
         model = Review
         fields = ('id', 'text', 'author', 'score', 'pub_date')
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer для комментариев"""
     author = serializers.SlugRelatedField(
         read_only=True,
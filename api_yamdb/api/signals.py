@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.versions import USERS, bump_version
+from users.models import User
+from .authentication import user_version_name
+from .cache import user_cache
+
+
+def username_changed(instance, update_fields):
+    """Изменилось ли имя пользователя, которое видно в отзывах."""
+    if update_fields is not None and 'username' not in update_fields:
+        return False
+    loaded = getattr(instance, '_loaded_values', {})
+    changed = loaded.get('username') != instance.username
+    loaded['username'] = instance.username
+    return changed
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    """Сбрасывает кэш аутентификации, а при смене имени - ETag ответов
+    с именами авторов (отзывов и комментариев нового пользователя нет).
+    """
+    user_cache.delete(instance.pk)
+    names = [user_version_name(instance.pk)]
+    if not created and username_changed(instance, update_fields):
+        names.append(USERS)
+    bump_version(*names)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    """Сбрасывает кэш аутентификации; отзывы и комментарии пользователя
+    удаляются каскадно и меняют версии своих списков сами.
+    """
+    user_cache.delete(instance.pk)
+    bump_version(user_version_name(instance.pk))
@@ -1,9 +1,9 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, TitleViewSet,
-                    UserViewSet, TokenRegApiView, signup, )
+from .views import (CacheStatsView, CategoryViewSet, ChangesView,
+                    CommentViewSet, ExportView, GenreViewSet, ReviewViewSet,
+                    TitleViewSet, UserViewSet, TokenRegApiView, signup, )
 
 app_name = 'api'
 
@@ -27,4 +27,7 @@ jwt_patterns = [
 urlpatterns = [
     path('', include(v1_router.urls)),
     path('auth/', include(jwt_patterns)),
+    path('cache/stats/', CacheStatsView.as_view(), name='cache_stats'),
+    path('changes/', ChangesView.as_view(), name='changes'),
+    path('export/<slug:dataset>/', ExportView.as_view(), name='export'),
 ]
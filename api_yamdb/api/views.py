@@ -1,28 +1,48 @@
+from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db.models import Count
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action, api_view
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from api_yamdb import settings
-from .filters import TitleFilter
-from .mixins import AdminViewSet
+from .bulk import create_titles
+from .export import CONTENT_TYPES, DATASETS, NDJSON, export_chunks
+from .filters import TitleFilter, TitleOrderingFilter, TitleSearchFilter
+from .cache import response_cache
+from .mixins import (AdminViewSet, ConditionalGetMixin,
+                     SparseQuerysetMixin)
+from .pagination import KeysetPagination, ReviewCommentPagination
 from .permissions import (IsAdmin, IsAdminOrReadOnly,
                           IsAuthorOrModeRatOrOrAdminOrReadOnly)
+from .representations import (TITLE_COLUMNS, TITLE_DETAIL_FIELDS,
+                              TITLE_FIELDS, represent_changes,
+                              represent_facets, represent_leaderboard,
+                              represent_titles, title_fields, title_values)
 from .serializers import (CategorySerializer, CommentSerializer,
                           GenreSerializer, ReviewSerializer,
-                          SignUpSerializer, TitlePostSerialzier,
-                          TitleSerializer, TokenRegSerializer,
-                          UserEditSerializer, UserSerializer)
+                          SignUpSerializer, TitleDetailSerializer,
+                          TitlePostSerialzier, TitleSerializer,
+                          TokenRegSerializer, UserEditSerializer,
+                          UserSerializer, requested_fields)
 
 
+from reviews.changelog import changes_since, last_cursor
+from reviews.facets import FACETS, grouped_counts, stored_counts
+from reviews.leaderboard import get_leaderboard, scope_name
 from reviews.models import Category, Genre, Review, Title
+from reviews.versions import (TITLES, USERS, comments_version_name,
+                              reviews_version_name, title_version_name)
 from users.models import User
+from users.outbox import enqueue_email
 
 
 @api_view(['POST'])
@@ -38,17 +58,18 @@ def signup(request):
         email=email
     )
     code = default_token_generator.make_token(user)
-    send_mail(
+    enqueue_email(
         'Код токена',
         f'Код для получения токена {code}',
-        settings.DEFAULT_FROM_EMAIL,
-        [serializer.validated_data.get('email')]
+        serializer.validated_data.get('email'),
     )
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 class TokenRegApiView(APIView):
     """View для авторизации по токену."""
+    compression_exempt = True
+
     def post(self, request):
         serializer = TokenRegSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -64,6 +85,61 @@ class TokenRegApiView(APIView):
                         status=status.HTTP_200_OK)
 
 
+class CacheStatsView(APIView):
+    """View статистики локального кэша ответов (только администратор)."""
+    permission_classes = (IsAdmin,)
+
+    def get(self, request):
+        return Response(response_cache.stats(), status=status.HTTP_200_OK)
+
+
+class ChangesView(APIView):
+    """View журнала изменений каталога для синхронизации.
+
+    Без параметра `since` возвращает курсор последнего изменения: после
+    полной выгрузки каталога клиент запрашивает изменения после него.
+    """
+    since_query_param = 'since'
+
+    def get(self, request):
+        since = request.query_params.get(self.since_query_param)
+        if since is None:
+            return Response({'cursor': last_cursor(), 'has_more': False,
+                             'results': []})
+        try:
+            since = int(since)
+        except ValueError:
+            raise ValidationError({self.since_query_param: [
+                'Курсор должен быть целым числом.']})
+        entries, cursor, has_more = changes_since(
+            since, settings.CHANGES_PAGE_SIZE)
+        return Response({'cursor': cursor, 'has_more': has_more,
+                         'results': represent_changes(entries)})
+
+
+class ExportView(APIView):
+    """View потоковой выгрузки произведений и отзывов (администратор).
+
+    Формат выбирается параметром `output` (`ndjson` или `csv`):
+    параметр `format` занят DRF.
+    """
+    permission_classes = (IsAdmin,)
+    output_query_param = 'output'
+
+    def get(self, request, dataset):
+        if dataset not in DATASETS:
+            raise Http404
+        output = request.query_params.get(self.output_query_param, NDJSON)
+        if output not in CONTENT_TYPES:
+            raise ValidationError({self.output_query_param: [
+                f'Допустимые форматы: {", ".join(CONTENT_TYPES)}.']})
+        response = StreamingHttpResponse(
+            export_chunks(dataset, output), content_type=CONTENT_TYPES[output])
+        response['Content-Disposition'] = (
+            f'attachment; filename="{dataset}.{output}"')
+        return response
+
+
 class UserViewSet(viewsets.ModelViewSet):
     """View для получения информации о пользователе"""
     queryset = User.objects.all()
@@ -100,49 +176,290 @@ class GenreViewSet(AdminViewSet):
     serializer_class = GenreSerializer
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ConditionalGetMixin, SparseQuerysetMixin,
+                   viewsets.ModelViewSet):
     """View представления произведений."""
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score'))
+    queryset = Title.objects.select_related(
+        'category').prefetch_related('genre')
     serializer_class = TitleSerializer
     permission_classes = (IsAdminOrReadOnly,)
+    filter_backends = (DjangoFilterBackend, TitleOrderingFilter,
+                       TitleSearchFilter)
     filterset_class = TitleFilter
     filterset_fields = ('name',)
     ordering = ('name',)
+    sparse_columns = {
+        'rating': ('rating_sum', 'rating_count'),
+        'category': ('category__name', 'category__slug'),
+        'genre': (),
+        'scores': TITLE_COLUMNS['scores'],
+    }
+    sparse_related = {'category': 'category'}
+    sparse_prefetch = {'genre': 'genre'}
+    fast_read = True
+    facets_query_param = 'facets'
+    ids_query_param = 'ids'
 
     def get_serializer_class(self):
         if self.request.method in ['POST', 'PUT', 'PATCH']:
             return TitlePostSerialzier
+        if self.action == 'retrieve':
+            return TitleDetailSerializer
         return TitleSerializer
 
+    def get_etag_versions(self):
+        catalog = (Category._meta.model_name, Genre._meta.model_name)
+        if self.action == 'retrieve':
+            return (title_version_name(self.url_id('pk')), *catalog)
+        return (TITLES, *catalog)
+
+    def get_values_queryset(self):
+        """Строки произведений для быстрого представления."""
+        available = (TITLE_DETAIL_FIELDS if self.action == 'retrieve'
+                     else TITLE_FIELDS)
+        self.response_fields = title_fields(
+            requested_fields(self.request), available)
+        return title_values(self.filter_queryset(self.get_queryset()),
+                            self.response_fields)
+
+    def list(self, request, *args, **kwargs):
+        if self.ids_query_param in request.query_params:
+            return self.conditional(self.list_batch, request, *args,
+                                    **kwargs)
+        if not self.fast_read:
+            return super().list(request, *args, **kwargs)
+        return self.conditional(self.list_values, request, *args, **kwargs)
+
+    def requested_ids(self):
+        """id из ?ids=1,2,3 без повторов в порядке запроса."""
+        raw = self.request.query_params.get(self.ids_query_param, '')
+        try:
+            ids = [int(value) for value in raw.split(',') if value.strip()]
+        except ValueError:
+            ids = None
+        if not ids or min(ids) < 1:
+            raise ValidationError({self.ids_query_param: [
+                'Укажите id произведений через запятую.']})
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > settings.TITLE_BATCH_MAX_IDS:
+            raise ValidationError({self.ids_query_param: [
+                'Не больше {} id за запрос.'.format(
+                    settings.TITLE_BATCH_MAX_IDS)]})
+        return ids
+
+    def list_batch(self, request, *args, **kwargs):
+        """Произведения по списку id одним ответом без пагинации.
+
+        Фильтры применяются как в списке; id, которых нет в выборке,
+        перечисляются в `missing`.
+        """
+        ids = self.requested_ids()
+        if self.fast_read:
+            rows = list(self.get_values_queryset().filter(id__in=ids))
+            found = dict(zip((row['id'] for row in rows),
+                             represent_titles(rows, self.response_fields)))
+        else:
+            titles = list(self.filter_queryset(
+                self.get_queryset()).filter(id__in=ids))
+            found = dict(zip((title.pk for title in titles),
+                             self.get_serializer(titles, many=True).data))
+        return Response({
+            'results': [found[pk] for pk in ids if pk in found],
+            'missing': [pk for pk in ids if pk not in found],
+        })
+
+    def list_values(self, request, *args, **kwargs):
+        queryset = self.get_values_queryset()
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(represent_titles(queryset, self.response_fields))
+        return self.get_paginated_response(
+            represent_titles(page, self.response_fields))
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    def requested_facets(self):
+        """Фасеты из ?facets=genre,category,year."""
+        raw = self.request.query_params.get(self.facets_query_param, '')
+        names = {name.strip() for name in raw.split(',')}
+        return [kind for kind in FACETS if kind in names]
+
+    def is_filtered(self):
+        params = self.request.query_params
+        return any(params.get(name) for name in (
+            *TitleFilter.base_filters, TitleSearchFilter.search_param))
+
+    def get_paginated_response(self, data):
+        """Добавляет к странице счетчики запрошенных фасетов.
+
+        Без фильтров счетчики читаются из поддерживаемой сигналами
+        таблицы, с фильтрами считаются группировкой по выборке.
+        """
+        response = super().get_paginated_response(data)
+        kinds = self.requested_facets()
+        if kinds:
+            counts = (grouped_counts(
+                self.filter_queryset(self.get_queryset()), kinds)
+                if self.is_filtered() else stored_counts(kinds))
+            response.data['facets'] = represent_facets(counts)
+        return response
+
+    def get_leaderboard_scope(self):
+        """Список рейтинга по ?genre= или ?category= (slug)."""
+        genre = self.request.query_params.get('genre')
+        category = self.request.query_params.get('category')
+        if genre and category:
+            raise ValidationError(
+                'Укажите только один из параметров genre или category.')
+        if genre:
+            return scope_name(genre_id=get_object_or_404(
+                Genre.objects.only('id'), slug=genre).pk)
+        if category:
+            return scope_name(category_id=get_object_or_404(
+                Category.objects.only('id'), slug=category).pk)
+        return scope_name()
+
+    @action(detail=False, url_path='top')
+    def top(self, request):
+        """Лучшие произведения по байесовскому среднему оценок.
+
+        ?limit= задает длину списка (не больше LEADERBOARD_SIZE).
+        """
+        try:
+            limit = int(request.query_params.get('limit', ''))
+        except ValueError:
+            limit = settings.LEADERBOARD_SIZE
+        limit = min(max(limit, 1), settings.LEADERBOARD_SIZE)
+        items = get_leaderboard(self.get_leaderboard_scope(), limit)
+        return Response(represent_leaderboard(
+            items, title_fields(requested_fields(request))))
+
+    @action(detail=True, url_path='page')
+    def page(self, request, pk=None):
+        """Страница произведения одним ответом за три запроса.
+
+        Произведение с распределением оценок, первые отзывы (?reviews=,
+        по умолчанию TITLE_PAGE_REVIEWS) с авторами и количеством
+        комментариев, ссылка на продолжение списка отзывов.
+        """
+        try:
+            limit = int(request.query_params.get('reviews', ''))
+        except ValueError:
+            limit = settings.TITLE_PAGE_REVIEWS
+        limit = min(max(limit, 1), settings.TITLE_PAGE_MAX_REVIEWS)
+        row = get_object_or_404(
+            title_values(Title.objects.all(), TITLE_DETAIL_FIELDS), pk=pk)
+        reviews = list(
+            Review.objects.filter(title_id=row['id'])
+            .select_related('author')
+            .annotate(comments_count=Count('comments'))
+            .order_by('pub_date', 'id')[:limit + 1]
+        )
+        next_link = None
+        if len(reviews) > limit:
+            reviews = reviews[:limit]
+            next_link = KeysetPagination(limit).link_after(
+                request, reverse('api:reviews-list', args=(row['id'],)),
+                reviews[-1])
+        results = ReviewSerializer(reviews, many=True).data
+        for data, review in zip(results, reviews):
+            data['comments_count'] = review.comments_count
+        return Response({
+            'title': represent_titles([row], TITLE_DETAIL_FIELDS)[0],
+            'reviews': {'count': row['rating_count'], 'next': next_link,
+                        'results': results},
+        })
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """Массовое создание произведений из массива объектов.
+
+        Создаются все корректные элементы; ошибки остальных
+        возвращаются с номерами элементов в массиве.
+        """
+        if not isinstance(request.data, list):
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                'Ожидался массив произведений.']})
+        if len(request.data) > settings.TITLE_BULK_MAX_ITEMS:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                'Не больше {} произведений за запрос.'.format(
+                    settings.TITLE_BULK_MAX_ITEMS)]})
+        created, errors = create_titles(request.data)
+        rows = {row['id']: row for row in title_values(
+            Title.objects.filter(id__in=[title.pk for _, title in created]))}
+        titles = represent_titles([rows[title.pk] for _, title in created])
+        return Response({
+            'created': [{'index': index, **data} for (index, _), data
+                        in zip(created, titles)],
+            'errors': [{'index': index, 'errors': item_errors}
+                       for index, item_errors in sorted(errors.items())],
+        }, status=(status.HTTP_201_CREATED if created
+                   else status.HTTP_400_BAD_REQUEST))
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.fast_read:
+            return super().retrieve(request, *args, **kwargs)
+        return self.conditional(self.retrieve_values, request, *args,
+                                **kwargs)
+
+    def retrieve_values(self, request, *args, **kwargs):
+        row = get_object_or_404(self.get_values_queryset(),
+                                pk=self.kwargs['pk'])
+        return Response(represent_titles([row], self.response_fields)[0])
+
+
+class ReviewViewSet(ConditionalGetMixin, SparseQuerysetMixin,
+                    viewsets.ModelViewSet):
     """View представления оценок."""
     serializer_class = ReviewSerializer
     permission_classes = (IsAuthorOrModeRatOrOrAdminOrReadOnly,)
+    pagination_class = ReviewCommentPagination
+    sparse_columns = {'author': ('author__username',)}
+    sparse_related = {'author': 'author'}
+
+    def get_title(self):
+        """Произведение из URL, загружается один раз за запрос."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, id=self.kwargs.get('title_id'))
+        return self._title
+
+    def get_etag_versions(self):
+        return (reviews_version_name(self.url_id('title_id')), USERS)
 
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        return title.reviews.all()
+        return self.get_title().reviews.select_related('author')
 
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author=self.request.user, title=self.get_title())
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, SparseQuerysetMixin,
+                     viewsets.ModelViewSet):
     """View представления комментариев."""
     serializer_class = CommentSerializer
     permission_classes = (IsAuthorOrModeRatOrOrAdminOrReadOnly,)
+    pagination_class = ReviewCommentPagination
+    sparse_columns = {'author': ('author__username',)}
+    sparse_related = {'author': 'author'}
+
+    def get_review(self):
+        """Отзыв из URL вместе с произведением, одним запросом за запрос.
+
+        Отзыв должен относиться к произведению из URL.
+        """
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review.objects.select_related('title'),
+                id=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id'),
+            )
+        return self._review
+
+    def get_etag_versions(self):
+        return (reviews_version_name(self.url_id('title_id')),
+                comments_version_name(self.url_id('review_id')), USERS)
 
     def get_queryset(self):
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, id=review_id)
-        return review.comments.all()
+        return self.get_review().comments.select_related('author')
 
     def perform_create(self, serializer):
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, id=review_id)
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_review())
@@ -27,6 +27,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -66,6 +67,15 @@ DATABASES = {
     }
 }
 
+# Версии коллекций для инвалидации кэшей хранятся в БД (reviews.versions)
+# и общие для всех процессов; кэш Django хранит только списки лучших
+# произведений.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -103,9 +113,24 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 DEFAULT_FROM_EMAIL = 'reviews@api.api'
 
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_BACKOFF = 60
+# Срок, на который воркер забирает письма из очереди, с.
+EMAIL_OUTBOX_LEASE = 300
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        'api.authentication.CachedJWTAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
@@ -124,6 +149,33 @@ SIMPLE_JWT = {
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
 }
 
+COMPRESSION_MIN_SIZE = 512
+COMPRESSION_CACHE_SIZE = 256
+COMPRESSION_BROTLI_QUALITY = 5
+
+AUTH_USER_CACHE_SIZE = 1024
+AUTH_USER_CACHE_TTL = 300
+
+# Рейтинги лучших: размер списка, запас для инкрементальных обновлений
+# и априорная оценка байесовского среднего с ее весом (в оценках).
+# Время жизни списка в кэше (в секундах) ограничивает устаревание списков
+# других процессов, пока кэш Django локальный.
+LEADERBOARD_TIMEOUT = 60
+LEADERBOARD_SIZE = 10
+LEADERBOARD_SLACK = 10
+LEADERBOARD_PRIOR_MEAN = 5.5
+LEADERBOARD_PRIOR_WEIGHT = 10
+
+TITLE_BULK_MAX_ITEMS = 1000
+TITLE_BATCH_MAX_IDS = 100
+TITLE_PAGE_REVIEWS = 5
+TITLE_PAGE_MAX_REVIEWS = 20
+
+CHANGES_PAGE_SIZE = 500
+
+# Количество строк в одном запросе потоковой выгрузки.
+EXPORT_BATCH_SIZE = 2000
+
 LIMIT_TEXT = 30
 LIMIT_SLUG = 50
 LIMIT_CHAT = 256
@@ -1,7 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ReviewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reviews'
     verbose_name = 'Отзывы'
+
+    def ready(self):
+        from . import signals
+        post_migrate.connect(signals.create_title_search_index, sender=self)
+        post_migrate.connect(signals.reset_versions, sender=self)
@@ -0,0 +1,47 @@
+"""Журнал изменений каталога: произведения, жанры, категории и отзывы.
+
+Записи добавляют сигналы, а массовое создание произведений - само.
+Загрузка CSV и другие операции в обход ORM в журнал не попадают: после
+них партнерам нужна полная синхронизация. Удаление категории или жанра
+записывается только для них самих, без записей о затронутых
+произведениях.
+"""
+from .models import ChangeLog
+
+
+def record(model, action, *object_ids):
+    """Добавляет записи об изменении объектов модели `model`."""
+    entries = [
+        ChangeLog(model=model._meta.model_name, object_id=pk, action=action)
+        for pk in object_ids
+    ]
+    if len(entries) == 1:
+        # bulk_create открывает транзакцию даже для одной строки.
+        entries[0].save(force_insert=True)
+    else:
+        ChangeLog.objects.bulk_create(entries)
+
+
+def last_cursor():
+    """Курсор последней записи журнала (0 для пустого журнала)."""
+    return ChangeLog.objects.order_by('-id').values_list(
+        'id', flat=True).first() or 0
+
+
+def changes_since(since, limit):
+    """Изменения после курсора `since`, не больше `limit` записей.
+
+    Для каждого объекта остается последняя запись, поэтому `created`
+    и `updated` клиент применяет одинаково. Возвращает записи, курсор
+    для следующего запроса и признак, что записи еще есть.
+    """
+    entries = list(ChangeLog.objects.filter(id__gt=since)[:limit + 1])
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    latest = {}
+    for entry in entries:
+        key = entry.model, entry.object_id
+        latest.pop(key, None)
+        latest[key] = entry
+    cursor = entries[-1].id if entries else since
+    return list(latest.values()), cursor, has_more
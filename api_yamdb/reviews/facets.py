@@ -0,0 +1,91 @@
+"""Счетчики фасетов каталога: жанры, категории и годы произведений.
+
+Счетчики хранятся в TitleFacet и поддерживаются сигналами, поэтому
+фасеты всего каталога читаются одним запросом к небольшой таблице.
+Для отфильтрованной выборки счетчики считаются группировкой.
+"""
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from .models import Title, TitleFacet
+
+FACETS = (TitleFacet.GENRE, TitleFacet.CATEGORY, TitleFacet.YEAR)
+FACET_COLUMNS = {TitleFacet.CATEGORY: 'category_id', TitleFacet.YEAR: 'year'}
+
+
+def change_facet(kind, values, delta):
+    """Изменяет счетчики значений `values` фасета `kind` на `delta`."""
+    values = {value for value in values if value is not None}
+    if not values or not delta:
+        return
+    counters = TitleFacet.objects.filter(kind=kind, value__in=values)
+    if counters.update(count=F('count') + delta) == len(values) or delta < 0:
+        return
+    existing = set(counters.values_list('value', flat=True))
+    for value in values - existing:
+        try:
+            with transaction.atomic():
+                TitleFacet.objects.create(kind=kind, value=value,
+                                          count=delta)
+        except IntegrityError:
+            # Счетчик создан параллельным запросом.
+            TitleFacet.objects.filter(kind=kind, value=value).update(
+                count=F('count') + delta)
+
+
+def count_created(titles, genre_links):
+    """Учитывает произведения, созданные bulk_create без сигналов."""
+    counters = {
+        TitleFacet.GENRE: Counter(link.genre_id for link in genre_links),
+        TitleFacet.CATEGORY: Counter(title.category_id for title in titles),
+        TitleFacet.YEAR: Counter(title.year for title in titles),
+    }
+    for kind, counter in counters.items():
+        values_by_delta = defaultdict(list)
+        for value, delta in counter.items():
+            values_by_delta[delta].append(value)
+        for delta, values in values_by_delta.items():
+            change_facet(kind, values, delta)
+
+
+def stored_counts(kinds=FACETS):
+    """Счетчики всего каталога из таблицы TitleFacet."""
+    counts = {kind: {} for kind in kinds}
+    rows = (TitleFacet.objects.filter(kind__in=kinds, count__gt=0)
+            .values_list('kind', 'value', 'count'))
+    for kind, value, count in rows:
+        counts[kind][value] = count
+    return counts
+
+
+def grouped_counts(queryset, kinds=FACETS):
+    """Счетчики для произвольной выборки произведений (GROUP BY)."""
+    titles = queryset.order_by()
+    counts = {}
+    for kind in kinds:
+        if kind == TitleFacet.GENRE:
+            rows = (Title.genre.through.objects
+                    .filter(title_id__in=titles.values('id'))
+                    .order_by().values_list('genre_id')
+                    .annotate(Count('title_id')))
+        else:
+            column = FACET_COLUMNS[kind]
+            rows = (titles.filter(**{f'{column}__isnull': False})
+                    .values_list(column).annotate(Count('id', distinct=True)))
+        counts[kind] = dict(rows)
+    return counts
+
+
+def rebuild_facets():
+    """Пересчитывает счетчики с нуля (после массовых операций)."""
+    with transaction.atomic():
+        counts = grouped_counts(Title.objects.all())
+        TitleFacet.objects.all().delete()
+        TitleFacet.objects.bulk_create(
+            TitleFacet(kind=kind, value=value, count=count)
+            for kind, values in counts.items()
+            for value, count in values.items()
+        )
+    return sum(len(values) for values in counts.values())
@@ -0,0 +1,144 @@
+"""Рейтинги лучших произведений: всего каталога, жанра и категории.
+
+Произведения ранжируются по байесовскому среднему
+(S + C * m) / (N + C), где S и N - сумма и количество оценок,
+m - априорная средняя оценка, C - ее вес. Одна оценка 10 не поднимает
+произведение выше сотен оценок 9.
+
+Списки хранятся в кэше Django LEADERBOARD_TIMEOUT секунд и ограничены
+LEADERBOARD_SIZE произведениями плюс LEADERBOARD_SLACK запасных.
+Изменение отзыва после фиксации транзакции обновляет только списки
+произведения и только если в кэше есть общий список: без него
+изменение обходится без запросов, а списки жанров и категорий
+перестраиваются по истечении LEADERBOARD_TIMEOUT. Список без запаса,
+из которого выпали произведения, перестраивается одним запросом при
+чтении. Изменения состава жанров и категорий меняют версию всех
+списков; версия хранится в самом списке, а не в ключе, чтобы наличие
+общего списка проверялось без обращения к БД.
+
+Одновременные изменения одного списка могут потерять обновление до
+его перестроения: списки - витрина, а не источник данных. С кэшем в
+памяти процесса изменения отзывов в других процессах попадают в
+список при его перестроении по истечении LEADERBOARD_TIMEOUT.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import ExpressionWrapper, F, FloatField, Value
+
+from .models import Title
+from .versions import get_version
+
+LEADERBOARD = 'leaderboard'
+ALL = 'all'
+KEY = 'leaderboard:{scope}'
+
+
+def scope_name(genre_id=None, category_id=None):
+    """Имя списка: весь каталог, жанр или категория."""
+    if genre_id is not None:
+        return f'genre:{genre_id}'
+    if category_id is not None:
+        return f'category:{category_id}'
+    return ALL
+
+
+def capacity():
+    return settings.LEADERBOARD_SIZE + settings.LEADERBOARD_SLACK
+
+
+def bayesian_score(rating_sum, rating_count):
+    """Байесовское среднее; None для произведений без оценок."""
+    if not rating_count:
+        return None
+    weight = settings.LEADERBOARD_PRIOR_WEIGHT
+    return ((rating_sum + weight * settings.LEADERBOARD_PRIOR_MEAN)
+            / (rating_count + weight))
+
+
+def _rank(item):
+    title_id, score = item
+    return -score, title_id
+
+
+def _key(scope):
+    return KEY.format(scope=scope)
+
+
+def build_leaderboard(scope):
+    """Выбирает лучшие произведения списка `scope` из БД."""
+    weight = settings.LEADERBOARD_PRIOR_WEIGHT
+    titles = Title.objects.filter(rating_count__gt=0)
+    kind, _, pk = scope.partition(':')
+    if kind == 'genre':
+        titles = titles.filter(genre=pk)
+    elif kind == 'category':
+        titles = titles.filter(category=pk)
+    score = ExpressionWrapper(
+        (F('rating_sum') + Value(weight * settings.LEADERBOARD_PRIOR_MEAN))
+        / (F('rating_count') + Value(float(weight))),
+        output_field=FloatField(),
+    )
+    rows = (titles.annotate(score=score).order_by('-score', 'id')
+            .values_list('id', 'rating_sum', 'rating_count')[:capacity()])
+    items = sorted(((pk, bayesian_score(total, count))
+                    for pk, total, count in rows), key=_rank)
+    return {'complete': len(items) < capacity(), 'items': items}
+
+
+def get_leaderboard(scope, limit=None):
+    """Лучшие произведения списка: пары (id, байесовское среднее)."""
+    key = _key(scope)
+    version = get_version(LEADERBOARD)
+    board = cache.get(key)
+    if board is None or board['version'] != version:
+        board = dict(build_leaderboard(scope), version=version)
+        cache.set(key, board, timeout=settings.LEADERBOARD_TIMEOUT)
+    return board['items'][:limit or settings.LEADERBOARD_SIZE]
+
+
+def place(board, title_id, score):
+    """Обновляет позицию произведения в списке.
+
+    Неполный список знает только произведения не хуже своей границы,
+    поэтому опустившееся ниже нее произведение из него выпадает.
+    Возвращает None, если список исчерпал запас и должен быть
+    перестроен.
+    """
+    boundary = board['items'][-1] if board['items'] else None
+    items = [item for item in board['items'] if item[0] != title_id]
+    complete = board['complete']
+    if score is not None:
+        item = (title_id, score)
+        if complete or (boundary and _rank(item) <= _rank(boundary)):
+            items.append(item)
+            items.sort(key=_rank)
+    if len(items) > capacity():
+        items, complete = items[:capacity()], False
+    if not complete and len(items) < settings.LEADERBOARD_SIZE:
+        return None
+    return {**board, 'complete': complete, 'items': items}
+
+
+def refresh_title(title_id):
+    """Переносит новую оценку произведения в его закэшированные списки."""
+    if cache.get(_key(ALL)) is None:
+        return
+    version = get_version(LEADERBOARD)
+    rows = list(Title.objects.filter(pk=title_id).values_list(
+        'rating_sum', 'rating_count', 'category_id', 'genre'))
+    if not rows:
+        return
+    rating_sum, rating_count, category_id, _ = rows[0]
+    scopes = [ALL] + [scope_name(genre_id=row[3])
+                      for row in rows if row[3] is not None]
+    if category_id is not None:
+        scopes.append(scope_name(category_id=category_id))
+    score = bayesian_score(rating_sum, rating_count)
+    for key, board in cache.get_many(map(_key, scopes)).items():
+        if board['version'] != version:
+            continue
+        board = place(board, title_id, score)
+        if board is None:
+            cache.delete(key)
+        else:
+            cache.set(key, board, timeout=settings.LEADERBOARD_TIMEOUT)
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+
+from reviews.facets import rebuild_facets
+from reviews.leaderboard import LEADERBOARD
+from reviews.models import (AGGREGATE_FIELDS, SCORES, Review, Title,
+                            score_field)
+from reviews.versions import BULK, bump_version
+
+SCORE_FIELDS = [score_field(score) for score in SCORES]
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает с нуля денормализованные агрегаты произведений: '
+            'рейтинг и распределение оценок (например, после массовой '
+            'загрузки данных).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Количество произведений в одном UPDATE.')
+
+    def handle(self, *args, **options):
+        # Один проход по отзывам: счетчики всех оценок для каждого
+        # произведения, сумма и количество выводятся из гистограммы.
+        histograms = (Review.objects.order_by().values('title').annotate(**{
+            score_field(score): Count('id', filter=Q(score=score))
+            for score in SCORES
+        }))
+        with transaction.atomic():
+            Title.objects.update(**dict.fromkeys(AGGREGATE_FIELDS, 0))
+            titles = [self.build_title(row) for row in histograms]
+            Title.objects.bulk_update(titles, AGGREGATE_FIELDS,
+                                      batch_size=options['batch_size'])
+        facets = rebuild_facets()
+        bump_version(BULK, LEADERBOARD)
+        self.stdout.write(self.style.SUCCESS(
+            f'Агрегаты пересчитаны для произведений с отзывами: '
+            f'{len(titles)}, счетчиков фасетов: {facets}'
+        ))
+
+    def build_title(self, row):
+        title = Title(pk=row['title'])
+        for score in SCORES:
+            setattr(title, score_field(score), row[score_field(score)])
+        title.rating_count = sum(row[field] for field in SCORE_FIELDS)
+        title.rating_sum = sum(
+            score * row[score_field(score)] for score in SCORES)
+        return title
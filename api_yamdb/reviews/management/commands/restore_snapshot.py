@@ -0,0 +1,70 @@
+import gzip
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import IntegrityError, connection, transaction
+
+from reviews.leaderboard import LEADERBOARD
+from reviews.models import Category, Genre
+from reviews.search import ensure_title_index
+from reviews.snapshot import (SnapshotError, create_indexes,
+                              dependent_models, drop_indexes, insert_chunk,
+                              read_chunks, snapshot_models)
+from reviews.versions import BULK, TITLES, USERS, bump_version
+
+
+class Command(BaseCommand):
+    help = ('Заменяет данные приложений users и reviews данными снимка '
+            'команды snapshot. Строки вставляются пачками, индексы '
+            'SQLite создаются после загрузки.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл снимка (.jsonl.gz).')
+
+    def handle(self, *args, **options):
+        models = snapshot_models()
+        tables = [model._meta.db_table for model in models]
+        cleared = [model._meta.db_table for model in dependent_models(models)]
+        started = time.perf_counter()
+        try:
+            with transaction.atomic(), connection.cursor() as cursor, \
+                    gzip.open(options['path'], 'rt',
+                              encoding='utf-8') as stream:
+                dropped = drop_indexes(cursor, tables)
+                for table in reversed(tables + cleared):
+                    cursor.execute(
+                        f'DELETE FROM {connection.ops.quote_name(table)}')
+                self.load(cursor, read_chunks(stream, models))
+                index_started = time.perf_counter()
+                created = create_indexes(cursor, dropped)
+                for sql in connection.ops.sequence_reset_sql(
+                        no_style(), models):
+                    cursor.execute(sql)
+                self.stdout.write(
+                    f'Индексы и триггеры: {created} за '
+                    f'{time.perf_counter() - index_started:.2f} с')
+        except (OSError, IntegrityError, SnapshotError) as error:
+            raise CommandError(f'Снимок не восстановлен: {error}')
+        search_started = time.perf_counter()
+        if ensure_title_index():
+            self.stdout.write(
+                f'Полнотекстовый индекс: '
+                f'{time.perf_counter() - search_started:.2f} с')
+        bump_version(BULK, LEADERBOARD, TITLES, USERS,
+                     Category._meta.model_name, Genre._meta.model_name)
+        self.stdout.write(self.style.SUCCESS(
+            f'Снимок восстановлен за {time.perf_counter() - started:.2f} с'))
+
+    def load(self, cursor, chunks):
+        rows, elapsed = Counter(), Counter()
+        for model, columns, data in chunks:
+            chunk_started = time.perf_counter()
+            rows[model] += insert_chunk(cursor, model, columns, data)
+            elapsed[model] += time.perf_counter() - chunk_started
+        for model, count in rows.items():
+            rate = count / elapsed[model] if elapsed[model] else count
+            self.stdout.write(
+                f'{model._meta.db_table}: {count} строк за '
+                f'{elapsed[model]:.2f} с ({rate:.0f} строк/с)')
@@ -0,0 +1,42 @@
+import gzip
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.snapshot import dump_table, snapshot_models, write_header
+
+
+class Command(BaseCommand):
+    help = ('Сохраняет данные приложений users и reviews в сжатый снимок '
+            'по столбцам таблиц (восстановление - restore_snapshot).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл снимка (.jsonl.gz).')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Количество строк в одной пачке.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        models = snapshot_models()
+        started = time.perf_counter()
+        # Одна транзакция: таблицы читаются из согласованного состояния.
+        with transaction.atomic(), gzip.open(
+                path, 'wt', encoding='utf-8', compresslevel=6) as stream:
+            write_header(stream, models)
+            for model in models:
+                table_started = time.perf_counter()
+                rows = dump_table(stream, model, options['batch_size'])
+                self.report(model._meta.db_table, rows,
+                            time.perf_counter() - table_started)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Снимок {path}: {os.path.getsize(path)} байт '
+            f'за {elapsed:.2f} с'
+        ))
+
+    def report(self, table, rows, elapsed):
+        rate = rows / elapsed if elapsed else rows
+        self.stdout.write(
+            f'{table}: {rows} строк за {elapsed:.2f} с ({rate:.0f} строк/с)')
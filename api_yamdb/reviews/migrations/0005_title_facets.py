@@ -0,0 +1,49 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:22
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_title_facets(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    TitleFacet = apps.get_model('reviews', 'TitleFacet')
+    titles = Title.objects.order_by()
+    groups = (
+        ('genre', Title.genre.through.objects.order_by()
+         .values_list('genre_id').annotate(Count('title_id'))),
+        ('category', titles.filter(category__isnull=False)
+         .values_list('category_id').annotate(Count('id'))),
+        ('year', titles.values_list('year').annotate(Count('id'))),
+    )
+    TitleFacet.objects.bulk_create(
+        TitleFacet(kind=kind, value=value, count=count)
+        for kind, rows in groups for value, count in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_review_comment_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleFacet',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('genre', 'Жанр'), ('category', 'Категория'), ('year', 'Год')], max_length=16, verbose_name='Фасет')),
+                ('value', models.PositiveIntegerField(verbose_name='Значение')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Количество произведений')),
+            ],
+            options={
+                'verbose_name': 'Счетчик фасета',
+                'verbose_name_plural': 'Счетчики фасетов',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='titlefacet',
+            constraint=models.UniqueConstraint(fields=('kind', 'value'), name='unique_facet_kind_value'),
+        ),
+        migrations.RunPython(fill_title_facets, migrations.RunPython.noop),
+    ]
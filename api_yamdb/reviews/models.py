@@ -6,6 +6,18 @@ from reviews.utilites import current_year
 from users.models import User
 
 
+SCORES = range(settings.MIN_LIMIT_VALUE, settings.MAX_LIMIT_VALUE + 1)
+
+
+def score_field(score):
+    """Поле Title со счетчиком отзывов с оценкой `score`."""
+    return f'score_{score}'
+
+
+AGGREGATE_FIELDS = ('rating_sum', 'rating_count',
+                    *(score_field(score) for score in SCORES))
+
+
 class AbstractModelGenreCategory(models.Model):
     name = models.CharField('Имя', max_length=settings.LIMIT_CHAT)
     slug = models.SlugField(
@@ -53,10 +65,69 @@ class Title(models.Model):
         on_delete=models.SET_NULL,
         null=True,
     )
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок', default=0, editable=False)
+    rating_count = models.PositiveIntegerField(
+        'Количество оценок', default=0, editable=False)
+    score_1 = models.PositiveIntegerField(
+        'Оценок 1', default=0, editable=False)
+    score_2 = models.PositiveIntegerField(
+        'Оценок 2', default=0, editable=False)
+    score_3 = models.PositiveIntegerField(
+        'Оценок 3', default=0, editable=False)
+    score_4 = models.PositiveIntegerField(
+        'Оценок 4', default=0, editable=False)
+    score_5 = models.PositiveIntegerField(
+        'Оценок 5', default=0, editable=False)
+    score_6 = models.PositiveIntegerField(
+        'Оценок 6', default=0, editable=False)
+    score_7 = models.PositiveIntegerField(
+        'Оценок 7', default=0, editable=False)
+    score_8 = models.PositiveIntegerField(
+        'Оценок 8', default=0, editable=False)
+    score_9 = models.PositiveIntegerField(
+        'Оценок 9', default=0, editable=False)
+    score_10 = models.PositiveIntegerField(
+        'Оценок 10', default=0, editable=False)
 
     def __str__(self):
         return self.name
 
+    @property
+    def rating(self):
+        """Средняя оценка по хранимым агрегатам (None без отзывов)."""
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
+    @property
+    def scores(self):
+        """Распределение оценок: количество отзывов для каждой оценки."""
+        return {score: getattr(self, score_field(score)) for score in SCORES}
+
+    def save(self, *args, **kwargs):
+        """Сохраняет произведение без денормализованных агрегатов.
+
+        Агрегаты меняют только сигналы отзывов выражениями F() и
+        rebuild_aggregates, поэтому сохранение загруженного ранее
+        объекта не затирает оценки, добавленные после его загрузки.
+        """
+        if (not self._state.adding and not kwargs.get('force_insert')
+                and kwargs.get('update_fields') is None):
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in AGGREGATE_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает загруженные значения для пересчета фасетов."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
@@ -64,6 +135,72 @@ class Title(models.Model):
         default_related_name = "titles"
 
 
+class TitleFacet(models.Model):
+    """Количество произведений с данным жанром, категорией или годом.
+
+    Счетчики поддерживаются сигналами, `value` - id жанра или
+    категории либо год выпуска.
+    """
+    GENRE = 'genre'
+    CATEGORY = 'category'
+    YEAR = 'year'
+    KINDS = (
+        (GENRE, 'Жанр'),
+        (CATEGORY, 'Категория'),
+        (YEAR, 'Год'),
+    )
+    kind = models.CharField('Фасет', max_length=16, choices=KINDS)
+    value = models.PositiveIntegerField('Значение')
+    count = models.PositiveIntegerField('Количество произведений', default=0)
+
+    class Meta:
+        verbose_name = 'Счетчик фасета'
+        verbose_name_plural = 'Счетчики фасетов'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'value'],
+                name='unique_facet_kind_value'
+            )
+        ]
+
+
+class ChangeLog(models.Model):
+    """Запись журнала изменений каталога для синхронизации с партнерами.
+
+    id записи монотонно растет и служит курсором `?since=`.
+    """
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+    ACTIONS = (
+        (CREATED, 'Создан'),
+        (UPDATED, 'Изменен'),
+        (DELETED, 'Удален'),
+    )
+    model = models.CharField('Модель', max_length=16)
+    object_id = models.PositiveIntegerField('id объекта')
+    action = models.CharField('Действие', max_length=8, choices=ACTIONS)
+    created = models.DateTimeField('Время изменения', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Изменение каталога'
+        verbose_name_plural = 'Журнал изменений каталога'
+        ordering = ('id',)
+
+
+class CollectionVersion(models.Model):
+    """Версия коллекции для инвалидации кэшей (см. reviews.versions).
+
+    Версии хранятся в БД, чтобы их изменения видели все процессы.
+    """
+    name = models.CharField('Коллекция', max_length=100, primary_key=True)
+    value = models.BigIntegerField('Версия')
+
+    class Meta:
+        verbose_name = 'Версия коллекции'
+        verbose_name_plural = 'Версии коллекций'
+
+
 class AbstractModelReviewComments(models.Model):
     """Абстрактная модель для Review и Comments."""
     text = models.CharField(max_length=settings.LIMIT_CHAT)
@@ -79,7 +216,7 @@ class AbstractModelReviewComments(models.Model):
 
     class Meta:
         abstract = True
-        ordering = ('pub_date',)
+        ordering = ('pub_date', 'id')
 
 
 class Review(AbstractModelReviewComments):
@@ -99,10 +236,21 @@ class Review(AbstractModelReviewComments):
         ],
     )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает загруженные значения для пересчета рейтинга."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     class Meta(AbstractModelReviewComments.Meta):
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         default_related_name = 'reviews'
+        indexes = [
+            models.Index(fields=('title', 'pub_date', 'id'),
+                         name='review_title_pub_date_idx'),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['author', 'title'],
@@ -122,3 +270,7 @@ class Comments(AbstractModelReviewComments):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         default_related_name = "comments"
+        indexes = [
+            models.Index(fields=('review', 'pub_date', 'id'),
+                         name='comment_review_pub_date_idx'),
+        ]
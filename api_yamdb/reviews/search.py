@@ -0,0 +1,134 @@
+"""Полнотекстовый индекс названий и описаний произведений.
+
+На SQLite индекс хранится во внешней (external content) таблице FTS5,
+которая синхронизируется с reviews_title триггерами. Токенизатор
+unicode61 приводит к нижнему регистру любые буквы Unicode, в том числе
+кириллицу. Буква «ё» в индексе и в запросах заменяется на «е»: unicode61
+не считает ее буквой с диакритикой.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.utils import OperationalError
+
+FTS_TABLE = 'reviews_title_fts'
+TITLE_TABLE = 'reviews_title'
+TOKEN_RE = re.compile(r'\w+')
+YO_TABLE = str.maketrans('ёЁ', 'еЕ')
+
+
+def _fold_yo(column):
+    return f"replace(replace({column}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+def _index_values(row):
+    return (f'{row}.id, {_fold_yo(f"{row}.name")}, '
+            f'{_fold_yo(f"{row}.description")}')
+
+
+CREATE_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"name, description, content='{TITLE_TABLE}', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 2')"
+)
+TRIGGERS_SQL = {
+    f'{FTS_TABLE}_ai': (
+        f'AFTER INSERT ON {TITLE_TABLE} BEGIN '
+        f'INSERT INTO {FTS_TABLE}(rowid, name, description) '
+        f'VALUES ({_index_values("new")}); END'
+    ),
+    f'{FTS_TABLE}_ad': (
+        f'AFTER DELETE ON {TITLE_TABLE} BEGIN '
+        f'INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) '
+        f"VALUES ('delete', {_index_values('old')}); END"
+    ),
+    f'{FTS_TABLE}_au': (
+        f'AFTER UPDATE OF name, description ON {TITLE_TABLE} BEGIN '
+        f'INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) '
+        f"VALUES ('delete', {_index_values('old')}); "
+        f'INSERT INTO {FTS_TABLE}(rowid, name, description) '
+        f'VALUES ({_index_values("new")}); END'
+    ),
+}
+REBUILD_SQL = (
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')",
+    f'INSERT INTO {FTS_TABLE}(rowid, name, description) '
+    f'SELECT {_index_values(TITLE_TABLE)} FROM {TITLE_TABLE}',
+)
+
+_available = None
+
+
+def ensure_title_index(using=connection):
+    """Создает индекс и триггеры, если их нет, и перестраивает индекс.
+
+    Пересоздание таблицы reviews_title миграциями SQLite удаляет
+    триггеры, поэтому функция вызывается после каждой миграции.
+    """
+    if using.vendor != 'sqlite':
+        return False
+    with using.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            "AND tbl_name = %s", [TITLE_TABLE]
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if existing.issuperset(TRIGGERS_SQL):
+            return False
+        try:
+            cursor.execute(CREATE_TABLE_SQL)
+        except OperationalError:
+            # SQLite собран без FTS5: поиск работает через icontains.
+            return False
+        for name, body in TRIGGERS_SQL.items():
+            cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {body}')
+        for sql in REBUILD_SQL:
+            cursor.execute(sql)
+    return True
+
+
+def title_index_available():
+    """Проверяет, что полнотекстовый индекс создан в текущей БД."""
+    global _available
+    if _available is None:
+        if connection.vendor != 'sqlite':
+            _available = False
+        else:
+            tables = connection.introspection.table_names()
+            _available = FTS_TABLE in tables
+    return _available
+
+
+def build_match_query(text, column=None):
+    """Строит безопасное выражение MATCH: все слова как префиксы."""
+    tokens = TOKEN_RE.findall(text.translate(YO_TABLE))
+    if not tokens:
+        return None
+    terms = ' '.join(f'"{token}"*' for token in tokens)
+    if column is None:
+        return terms
+    return f'{column}: ({terms})'
+
+
+def search_titles(queryset, text, column=None):
+    """Фильтрует произведения по индексу, а без него через icontains.
+
+    `column` ограничивает поиск одним полем (например, `name`),
+    по умолчанию ищется по названию и описанию.
+    """
+    if not title_index_available():
+        if column is not None:
+            return queryset.filter(**{f'{column}__icontains': text})
+        return queryset.filter(
+            Q(name__icontains=text) | Q(description__icontains=text))
+    match = build_match_query(text, column)
+    if match is None:
+        return queryset
+    # RawSQL в id__in оборачивается в лишние скобки, и SQLite считает
+    # подзапрос скалярным, поэтому условие добавляется через extra().
+    return queryset.extra(
+        where=[f'{TITLE_TABLE}.id IN (SELECT rowid FROM {FTS_TABLE} '
+               f'WHERE {FTS_TABLE} MATCH %s)'],
+        params=[match],
+    )
@@ -0,0 +1,255 @@
+from django.db import connections, transaction
+from django.db.models import F
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+
+from .changelog import record
+from .facets import FACET_COLUMNS, change_facet
+from .leaderboard import LEADERBOARD, refresh_title
+from .models import (Category, ChangeLog, Comments, Genre, Review, Title,
+                     TitleFacet, score_field)
+from .search import ensure_title_index
+from .versions import (BULK, TITLES, bump_version, comments_version_name,
+                       reviews_version_name, title_version_name)
+
+
+def change_rating(title_id, added=None, removed=None):
+    """Атомарно учитывает оценки в агрегатах и гистограмме произведения.
+
+    `added` - оценка, которая появилась, `removed` - которая исчезла.
+    """
+    changes = {}
+    if added is not None:
+        changes[score_field(added)] = F(score_field(added)) + 1
+    if removed is not None:
+        removed_field = score_field(removed)
+        changes[removed_field] = changes.get(
+            removed_field, F(removed_field)) - 1
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=F('rating_sum') + (added or 0) - (removed or 0),
+        rating_count=(F('rating_count') + int(added is not None)
+                      - int(removed is not None)),
+        **changes,
+    )
+
+
+def reviews_changed(*title_ids):
+    """Меняет версии отзывов и обновляет рейтинги лучших произведений.
+
+    Рейтинги обновляются после фиксации транзакции, чтобы отмененное
+    изменение не попало в закэшированные списки.
+    """
+    title_ids = set(title_ids)
+    bump_version(TITLES, *(
+        name for title_id in title_ids
+        for name in (title_version_name(title_id),
+                     reviews_version_name(title_id))
+    ))
+
+    def refresh():
+        for title_id in title_ids:
+            refresh_title(title_id)
+
+    transaction.on_commit(refresh)
+    # Рейтинг - часть представления произведения.
+    record(Title, ChangeLog.UPDATED, *title_ids)
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, **kwargs):
+    """Учитывает новый или измененный отзыв в рейтинге произведения."""
+    loaded = getattr(instance, '_loaded_values', None)
+    if created or loaded is None:
+        change_rating(instance.title_id, added=instance.score)
+    elif loaded['title_id'] != instance.title_id:
+        change_rating(loaded['title_id'], removed=loaded['score'])
+        change_rating(instance.title_id, added=instance.score)
+    elif loaded['score'] != instance.score:
+        change_rating(instance.title_id, added=instance.score,
+                      removed=loaded['score'])
+    reviews_changed(instance.title_id,
+                    *([loaded['title_id']] if loaded else []))
+    instance._loaded_values = {
+        'title_id': instance.title_id, 'score': instance.score
+    }
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    """Исключает удаленный отзыв из рейтинга произведения."""
+    change_rating(instance.title_id, removed=instance.score)
+    reviews_changed(instance.title_id)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def title_changed(sender, instance, signal, **kwargs):
+    """Меняет версии произведения и списка произведений.
+
+    Удаление меняет и версию отзывов: у произведения без отзывов ее
+    иначе не изменит ни один сигнал, и старый ETag списка отзывов
+    давал бы 304 вместо 404.
+    """
+    names = [title_version_name(instance.pk)]
+    if signal is post_delete:
+        names.append(reviews_version_name(instance.pk))
+    bump_version(TITLES, *names)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    """Меняет версии произведений при изменении их жанров."""
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        bump_version(TITLES, title_version_name(instance.pk))
+    elif pk_set:
+        bump_version(TITLES, *map(title_version_name, pk_set))
+    else:
+        # Жанр очищен от всех произведений: их id неизвестны.
+        bump_version(BULK)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(m2m_changed, sender=Title.genre.through)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def catalog_structure_changed(sender, created=False, action=None, **kwargs):
+    """Сбрасывает рейтинги лучших при изменении состава списков.
+
+    Новое произведение без отзывов в рейтинги не попадает.
+    """
+    if created or (action is not None and not action.startswith('post_')):
+        return
+    bump_version(LEADERBOARD)
+
+
+@receiver(post_save, sender=Title)
+def title_facets_saved(sender, instance, created, **kwargs):
+    """Учитывает категорию и год произведения в счетчиках фасетов."""
+    loaded = getattr(instance, '_loaded_values', None)
+    for kind, column in FACET_COLUMNS.items():
+        value = getattr(instance, column)
+        if created or loaded is None:
+            change_facet(kind, [value], 1)
+        elif loaded.get(column, value) != value:
+            change_facet(kind, [loaded[column]], -1)
+            change_facet(kind, [value], 1)
+    instance._loaded_values = {
+        column: getattr(instance, column)
+        for column in FACET_COLUMNS.values()
+    }
+
+
+@receiver(pre_delete, sender=Title)
+def title_facets_deleted(sender, instance, **kwargs):
+    """Исключает удаляемое произведение из счетчиков фасетов.
+
+    Связи с жанрами удаляются каскадно без m2m_changed, поэтому жанры
+    читаются до удаления.
+    """
+    for kind, column in FACET_COLUMNS.items():
+        change_facet(kind, [getattr(instance, column)], -1)
+    change_facet(TitleFacet.GENRE,
+                 instance.genre.values_list('id', flat=True), -1)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_counted(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    """Поддерживает счетчики жанров при изменении связей.
+
+    В post_add Django передает только новые связи, а для удаления
+    существующие связи выбираются до изменения.
+    """
+    if reverse:
+        links = sender.objects.filter(genre_id=instance.pk)
+        if pk_set is not None:
+            links = links.filter(title_id__in=pk_set)
+    else:
+        links = sender.objects.filter(title_id=instance.pk)
+        if pk_set is not None:
+            links = links.filter(genre_id__in=pk_set)
+    if action == 'post_add':
+        if reverse:
+            change_facet(TitleFacet.GENRE, [instance.pk], len(pk_set))
+        else:
+            change_facet(TitleFacet.GENRE, pk_set, 1)
+    elif action in ('pre_remove', 'pre_clear'):
+        if reverse:
+            change_facet(TitleFacet.GENRE, [instance.pk], -links.count())
+        else:
+            change_facet(TitleFacet.GENRE,
+                         list(links.values_list('genre_id', flat=True)), -1)
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def facet_value_deleted(sender, instance, **kwargs):
+    """Удаляет счетчик удаленного жанра или категории."""
+    TitleFacet.objects.filter(
+        kind=sender._meta.model_name, value=instance.pk).delete()
+
+
+@receiver(post_save, sender=Comments)
+@receiver(post_delete, sender=Comments)
+def comment_changed(sender, instance, **kwargs):
+    """Меняет версию комментариев отзыва."""
+    bump_version(comments_version_name(instance.review_id))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def catalog_changed(sender, **kwargs):
+    """Инвалидирует кэши списков категорий и жанров."""
+    bump_version(sender._meta.model_name)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Review)
+def log_saved(sender, instance, created, **kwargs):
+    """Записывает создание или изменение объекта в журнал."""
+    record(sender, ChangeLog.CREATED if created else ChangeLog.UPDATED,
+           instance.pk)
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Review)
+def log_deleted(sender, instance, **kwargs):
+    """Записывает удаление объекта в журнал."""
+    record(sender, ChangeLog.DELETED, instance.pk)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def log_genres_changed(sender, instance, action, reverse, pk_set,
+                       **kwargs):
+    """Записывает изменение жанров как изменение произведений."""
+    if action in ('post_add', 'post_remove') and not pk_set:
+        return
+    if not reverse:
+        if action.startswith('post_'):
+            record(Title, ChangeLog.UPDATED, instance.pk)
+    elif action == 'pre_clear':
+        record(Title, ChangeLog.UPDATED, *sender.objects.filter(
+            genre_id=instance.pk).values_list('title_id', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        record(Title, ChangeLog.UPDATED, *pk_set)
+
+
+def reset_versions(sender, **kwargs):
+    """Меняет версии всех коллекций после миграций и очистки БД."""
+    bump_version(BULK)
+
+
+def create_title_search_index(sender, using, **kwargs):
+    """Поддерживает полнотекстовый индекс произведений после миграций."""
+    ensure_title_index(connections[using])
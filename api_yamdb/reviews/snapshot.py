@@ -0,0 +1,186 @@
+"""Снимок данных приложений users и reviews для stage и dev окружений.
+
+Снимок - файл gzip из строк JSON: заголовок со списком таблиц и пачки
+строк таблиц по столбцам, а не объектами моделей, как в dumpdata.
+Восстановление вставляет пачки executemany без создания объектов
+моделей и сигналов; на SQLite индексы и триггеры таблиц удаляются до
+загрузки и создаются после нее.
+
+В снимок не попадают очередь писем (письма из stage не должны уходить
+реальным получателям), версии кэшей и таблицы, ссылающиеся на модели вне снимка
+(группы и права пользователей). Строки таких таблиц, как и журнала
+админки, при восстановлении удаляются вместе с данными снимка.
+"""
+import json
+from datetime import date, datetime, time
+
+from django.apps import apps
+from django.db import connection
+from django.db.models import DateField, TimeField
+
+from .search import TRIGGERS_SQL
+
+FORMAT = 'yamdb-snapshot'
+VERSION = 1
+APPS = ('users', 'reviews')
+EXCLUDED = ('users.outgoingemail', 'reviews.collectionversion')
+
+
+class SnapshotError(Exception):
+    """Файл не является снимком или не подходит к схеме БД."""
+
+
+def snapshot_models():
+    """Модели снимка в порядке приложений, включая таблицы связей."""
+    candidates = [
+        model for label in APPS
+        for model in apps.get_app_config(label).get_models(
+            include_auto_created=True)
+        if model._meta.label_lower not in EXCLUDED
+    ]
+    return [model for model in candidates if all(
+        field.related_model in candidates
+        for field in model._meta.concrete_fields if field.is_relation
+    )]
+
+
+def dependent_models(models):
+    """Модели вне снимка, ссылающиеся на его таблицы прямо или через
+    другие такие модели, в порядке от ссылаемых к ссылающимся."""
+    targets, dependent = set(models), []
+    while True:
+        found = [
+            model for model in apps.get_models(include_auto_created=True)
+            if model not in targets and any(
+                field.related_model in targets
+                for field in model._meta.concrete_fields if field.is_relation)
+        ]
+        if not found:
+            return dependent
+        targets.update(found)
+        dependent.extend(found)
+
+
+def encode(value):
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} не сериализуется в снимок')
+
+
+def write_header(stream, models):
+    stream.write(json.dumps({
+        'format': FORMAT, 'version': VERSION,
+        'tables': [model._meta.db_table for model in models],
+    }) + '\n')
+
+
+def dump_table(stream, model, batch_size):
+    """Записывает строки таблицы пачками; возвращает число строк."""
+    fields = model._meta.concrete_fields
+    columns = [field.column for field in fields]
+    rows = model._base_manager.order_by('pk').values_list(
+        *(field.attname for field in fields))
+    pk_index = fields.index(model._meta.pk)
+    total, last = 0, None
+    while True:
+        batch = list((rows if last is None else rows.filter(pk__gt=last))
+                     [:batch_size])
+        if batch:
+            stream.write(json.dumps({
+                'table': model._meta.db_table, 'columns': columns,
+                'data': [list(column) for column in zip(*batch)],
+            }, separators=(',', ':'), ensure_ascii=False,
+                default=encode) + '\n')
+            total += len(batch)
+        if len(batch) < batch_size:
+            return total
+        last = batch[-1][pk_index]
+
+
+def read_chunks(stream, models):
+    """Пачки снимка: тройки (модель, столбцы, столбцы значений)."""
+    header = json.loads(stream.readline() or 'null')
+    if not isinstance(header, dict) or header.get('format') != FORMAT:
+        raise SnapshotError('Файл не является снимком.')
+    if header.get('version') != VERSION:
+        raise SnapshotError(
+            f'Неподдерживаемая версия снимка: {header.get("version")}.')
+    tables = {model._meta.db_table: model for model in models}
+    unknown = set(header['tables']) - set(tables)
+    if unknown:
+        raise SnapshotError(
+            f'Таблицы снимка нет в схеме: {", ".join(sorted(unknown))}.')
+    for line in stream:
+        chunk = json.loads(line)
+        yield tables[chunk['table']], chunk['columns'], chunk['data']
+
+
+def column_converters(model, columns):
+    """Преобразования значений столбцов к формату БД (даты и время)."""
+    fields = {field.column: field for field in model._meta.concrete_fields}
+    missing = set(columns) - set(fields)
+    if missing:
+        raise SnapshotError(
+            f'Столбцов {", ".join(sorted(missing))} нет в таблице '
+            f'{model._meta.db_table}: примените миграции.')
+    converters = []
+    for column in columns:
+        field = fields[column]
+        if isinstance(field, (DateField, TimeField)):
+            converters.append(
+                lambda value, field=field: field.get_db_prep_save(
+                    field.to_python(value), connection))
+        else:
+            converters.append(None)
+    return converters
+
+
+def insert_chunk(cursor, model, columns, data):
+    """Вставляет пачку одним executemany; возвращает число строк."""
+    for index, convert in enumerate(column_converters(model, columns)):
+        if convert is not None:
+            data[index] = [None if value is None else convert(value)
+                           for value in data[index]]
+    quote = connection.ops.quote_name
+    cursor.executemany(
+        f'INSERT INTO {quote(model._meta.db_table)} '
+        f'({", ".join(map(quote, columns))}) '
+        f'VALUES ({", ".join(["%s"] * len(columns))})',
+        list(zip(*data)),
+    )
+    return len(data[0]) if data else 0
+
+
+def drop_indexes(cursor, tables):
+    """Удаляет индексы и триггеры таблиц до загрузки (только SQLite).
+
+    Возвращает их SQL для create_indexes.
+    """
+    if connection.vendor != 'sqlite':
+        return []
+    cursor.execute(
+        'SELECT type, name, sql FROM sqlite_master '
+        "WHERE type IN ('index', 'trigger') AND sql IS NOT NULL "
+        f'AND tbl_name IN ({", ".join(["%s"] * len(tables))})',
+        list(tables),
+    )
+    dropped = cursor.fetchall()
+    for kind, name, _ in dropped:
+        cursor.execute(
+            f'DROP {kind.upper()} {connection.ops.quote_name(name)}')
+    return dropped
+
+
+def create_indexes(cursor, dropped):
+    """Создает удаленные индексы и триггеры заново.
+
+    Триггеры полнотекстового индекса пропускаются: их вместе с
+    перестроением индекса создает ensure_title_index.
+    """
+    created = 0
+    for kind, name, sql in dropped:
+        if kind == 'trigger' and name in TRIGGERS_SQL:
+            continue
+        cursor.execute(sql)
+        created += 1
+    return created
@@ -0,0 +1,81 @@
+"""Версии коллекций для инвалидации кэшей.
+
+Счетчики хранятся в таблице CollectionVersion, поэтому увеличение
+версии в одном процессе сразу видят все остальные: чтение версий -
+один запрос по первичному ключу. Строка коллекции создается при первом
+изменении со значением из текущего времени, поэтому после очистки
+таблицы версии не повторяются.
+"""
+import time
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import CollectionVersion
+
+# Версия, общая для всех данных: ее увеличивают массовые операции
+# (загрузка CSV, пересчет агрегатов), которые обходят сигналы.
+BULK = 'bulk'
+USERS = 'user'
+TITLES = 'title'
+
+
+def _initial():
+    return time.time_ns()
+
+
+def _create(names):
+    CollectionVersion.objects.bulk_create(
+        [CollectionVersion(name=name, value=_initial()) for name in names],
+        ignore_conflicts=True,
+    )
+
+
+def get_versions(*names):
+    """Возвращает версии нескольких коллекций одним запросом.
+
+    Коллекции без строки в таблице (еще не изменявшиеся) получают
+    версию BULK: ее строку заново создает каждая миграция и очистка БД.
+    """
+    found = dict(CollectionVersion.objects.filter(name__in={BULK, *names})
+                 .values_list('name', 'value'))
+    if BULK not in found:
+        _create([BULK])
+        found[BULK] = CollectionVersion.objects.get(name=BULK).value
+    return tuple(found.get(name, found[BULK]) for name in names)
+
+
+def get_version(name):
+    """Возвращает текущую версию коллекции `name`."""
+    return get_versions(name)[0]
+
+
+def title_version_name(title_id):
+    return f'{TITLES}:{title_id}'
+
+
+def reviews_version_name(title_id):
+    return f'reviews:{TITLES}:{title_id}'
+
+
+def comments_version_name(review_id):
+    return f'comments:review:{review_id}'
+
+
+def _bump(names):
+    updated = CollectionVersion.objects.filter(name__in=names).update(
+        value=F('value') + 1)
+    if updated < len(set(names)):
+        # Строки есть не у всех коллекций: существующие строки
+        # ignore_conflicts не меняет.
+        _create(set(names))
+
+
+def bump_version(*names):
+    """Увеличивает версии коллекций после изменения данных.
+
+    Версии меняются после фиксации текущей транзакции: иначе
+    параллельный запрос может прочитать старые данные под новой версией
+    и закэшировать их до следующего изменения.
+    """
+    transaction.on_commit(lambda: _bump(names))
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import User
+from .models import OutgoingEmail, User
 
 
 class UserAdmin(admin.ModelAdmin):
@@ -10,3 +10,12 @@ class UserAdmin(admin.ModelAdmin):
 
 
 admin.site.register(User)
+
+
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'recipient', 'subject', 'status', 'attempts',
+                    'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+
+
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
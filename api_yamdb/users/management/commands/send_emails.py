@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.outbox import drain_outbox
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди (outbox) пакетами.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Количество писем в одном пакете.')
+        parser.add_argument('--loop', action='store_true',
+                            help='Работать постоянно, опрашивая очередь.')
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help='Пауза между опросами пустой очереди, с.')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, retried, dead = drain_outbox(options['batch_size'])
+            if sent or retried or dead:
+                self.stdout.write(
+                    f'Отправлено: {sent}, отложено: {retried}, '
+                    f'не доставлено: {dead}'
+                )
+            if not options['loop']:
+                break
+            if not (sent or retried or dead):
+                time.sleep(options['interval'])
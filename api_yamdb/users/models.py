@@ -1,6 +1,7 @@
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from .validators import UsernameRegexValidator, username_me
@@ -54,6 +55,13 @@ class User(AbstractUser):
     def is_admin(self):
         return self.role == self.ADMIN or self.is_superuser or self.is_staff
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает загруженные значения для инвалидации кэшей."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     class Meta:
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
@@ -65,3 +73,45 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.username
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку (outbox)."""
+    PENDING = 'pending'
+    SENT = 'sent'
+    DEAD = 'dead'
+
+    CHOICES_STATUS = (
+        (PENDING, 'Ожидает отправки'),
+        (SENT, 'Отправлено'),
+        (DEAD, 'Не доставлено'),
+    )
+    subject = models.CharField('Тема', max_length=settings.LIMIT_CHAT)
+    body = models.TextField('Текст')
+    from_email = models.EmailField('Отправитель',
+                                   max_length=settings.LIMIT_EMAIL)
+    recipient = models.EmailField('Получатель',
+                                  max_length=settings.LIMIT_EMAIL)
+    status = models.CharField(
+        'Статус',
+        default=PENDING,
+        max_length=max(len(status) for status, _ in CHOICES_STATUS),
+        choices=CHOICES_STATUS)
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    next_attempt_at = models.DateTimeField('Следующая попытка',
+                                           default=timezone.now)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('id',)
+        indexes = [
+            models.Index(fields=('status', 'next_attempt_at'),
+                         name='outgoing_email_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
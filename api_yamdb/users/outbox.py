@@ -0,0 +1,101 @@
+"""Очередь исходящих писем: запись в запросе, отправка воркером."""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+
+def enqueue_email(subject, body, recipient, from_email=None):
+    """Ставит письмо в очередь вместо синхронной отправки."""
+    return OutgoingEmail.objects.create(
+        subject=subject, body=body, recipient=recipient,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+    )
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед следующей попыткой."""
+    return timedelta(
+        seconds=settings.EMAIL_OUTBOX_BACKOFF * 2 ** (attempts - 1))
+
+
+def deliver(email, backend, backend_error=None):
+    """Отправляет одно письмо и обновляет его статус в очереди."""
+    email.attempts += 1
+    try:
+        if backend_error is not None:
+            raise backend_error
+        EmailMessage(
+            email.subject, email.body, email.from_email,
+            [email.recipient], connection=backend,
+        ).send()
+    except Exception as error:
+        email.last_error = f'{type(error).__name__}: {error}'
+        if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            email.status = OutgoingEmail.DEAD
+        else:
+            email.next_attempt_at = (
+                timezone.now() + retry_delay(email.attempts))
+    else:
+        email.status = OutgoingEmail.SENT
+        email.sent_at = timezone.now()
+    email.save(update_fields=(
+        'attempts', 'status', 'sent_at', 'next_attempt_at', 'last_error',
+    ))
+    return email.status
+
+
+def claim_emails(batch_size):
+    """Забирает пакет готовых писем в короткой транзакции.
+
+    Письма откладываются на EMAIL_OUTBOX_LEASE секунд, чтобы другие
+    воркеры их не взяли; если воркер упадет до отправки, письма снова
+    станут готовыми после этого срока.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        queue = OutgoingEmail.objects.filter(
+            status=OutgoingEmail.PENDING, next_attempt_at__lte=now,
+        )
+        if connection.features.has_select_for_update_skip_locked:
+            queue = queue.select_for_update(skip_locked=True)
+        emails = list(queue[:batch_size])
+        lease = now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE)
+        OutgoingEmail.objects.filter(
+            pk__in=[email.pk for email in emails]).update(
+            next_attempt_at=lease)
+    for email in emails:
+        email.next_attempt_at = lease
+    return emails
+
+
+def drain_outbox(batch_size=None):
+    """Отправляет пакет готовых писем через одно соединение с бэкендом.
+
+    Письма отправляются вне транзакции: запись в БД не ждет почтовый
+    сервер. Неудачные письма откладываются с экспоненциальной
+    задержкой, после EMAIL_OUTBOX_MAX_ATTEMPTS попыток помечаются
+    недоставленными. Возвращает количество отправленных, отложенных и
+    недоставленных.
+    """
+    results = Counter()
+    emails = claim_emails(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE)
+    if emails:
+        backend = get_connection()
+        try:
+            backend.open()
+        except Exception as error:
+            backend_error = error
+        else:
+            backend_error = None
+        for email in emails:
+            results[deliver(email, backend, backend_error)] += 1
+        if backend_error is None:
+            backend.close()
+    return (results[OutgoingEmail.SENT], results[OutgoingEmail.PENDING],
+            results[OutgoingEmail.DEAD])
@@ -1,6 +1,8 @@
 import os
 import sys
 
+import pytest
+
 from django.utils.version import get_version
 
 root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -34,3 +36,16 @@ assert get_version() < '3.0.0', 'Пожалуйста, используйте в
 pytest_plugins = [
     'tests.fixtures.fixture_user',
 ]
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Кэши живут дольше тестовой БД, которая очищается между тестами.
+    from django.core.cache import cache
+    from api.cache import response_cache, user_cache
+    from api.middleware import compressed_cache
+
+    cache.clear()
+    response_cache.clear()
+    user_cache.clear()
+    compressed_cache.clear()
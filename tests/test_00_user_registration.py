@@ -1,6 +1,7 @@
 import pytest
 from django.contrib.auth import get_user_model
 from django.core import mail
+from django.core.management import call_command
 
 User = get_user_model()
 
@@ -85,6 +86,7 @@ class Test00UserRegistration:
         }
         request_type = 'POST'
         response = client.post(self.url_signup, data=valid_data)
+        call_command('send_emails')  # письма отправляются из очереди
         outbox_after = mail.outbox  # email outbox after user create
 
         assert response.status_code != 404, (
@@ -279,3 +281,67 @@ class Test00UserRegistration:
             f'Проверьте, что при {request_type} запросе `{self.url_signup}` нельзя создать '
             f'пользователя, username которого уже зарегистрирован и возвращается статус {code}'
         )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_00_signup_email_outbox(self, client, settings):
+        from users.models import OutgoingEmail
+
+        outbox_before_count = len(mail.outbox)
+        valid_data = {'email': 'queued@yamdb.fake', 'username': 'queued'}
+        response = client.post(self.url_signup, data=valid_data)
+        assert response.status_code == 200
+        assert len(mail.outbox) == outbox_before_count, (
+            f'Проверьте, что запрос `{self.url_signup}` не отправляет письмо синхронно, '
+            'а ставит его в очередь'
+        )
+        email = OutgoingEmail.objects.get(recipient=valid_data['email'])
+        assert email.status == OutgoingEmail.PENDING
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+        settings.EMAIL_HOST = '127.0.0.1'
+        settings.EMAIL_PORT = 1
+        settings.EMAIL_TIMEOUT = 1
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        call_command('send_emails')
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.PENDING and email.attempts == 1, (
+            'Проверьте, что при ошибке отправки письмо остается в очереди для повторной попытки'
+        )
+        assert email.last_error and email.next_attempt_at > email.created, (
+            'Проверьте, что повторная попытка откладывается'
+        )
+        OutgoingEmail.objects.update(next_attempt_at=email.created)
+        call_command('send_emails')
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.DEAD and email.attempts == 2, (
+            'Проверьте, что после исчерпания попыток письмо помечается недоставленным'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_00_outbox_sends_outside_transaction(self, client, monkeypatch):
+        from django.core.mail import EmailMessage
+        from django.db import connection
+
+        from users.models import OutgoingEmail
+        from users.outbox import claim_emails
+
+        client.post(self.url_signup, data={'email': 'lock@yamdb.fake', 'username': 'lock'})
+        in_transaction = []
+        send = EmailMessage.send
+
+        def checked_send(message, *args, **kwargs):
+            in_transaction.append(connection.in_atomic_block)
+            return send(message, *args, **kwargs)
+
+        monkeypatch.setattr(EmailMessage, 'send', checked_send)
+        call_command('send_emails')
+        assert in_transaction == [False], (
+            'Проверьте, что письма отправляются вне транзакции и не держат блокировку БД'
+        )
+        assert OutgoingEmail.objects.get().status == OutgoingEmail.SENT
+
+        client.post(self.url_signup, data={'email': 'lease@yamdb.fake', 'username': 'lease'})
+        assert len(claim_emails(10)) == 1
+        assert claim_emails(10) == [], (
+            'Проверьте, что забранные воркером письма не выдаются повторно'
+        )
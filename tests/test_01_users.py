@@ -571,3 +571,40 @@ class Test01UserAPI:
             'Проверьте, что при PATCH запросе `/api/v1/users/me/`, '
             'пользователь с ролью user не может сменить себе роль'
         )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_12_users_role_change_resets_auth_cache(self, admin_client, user, user_client):
+        response = user_client.get('/api/v1/users/')
+        assert response.status_code == 403
+        response = admin_client.patch(f'/api/v1/users/{user.username}/', data={'role': 'admin'})
+        assert response.status_code == 200
+        response = user_client.get('/api/v1/users/')
+        assert response.status_code == 200, (
+            'Проверьте, что после изменения роли пользователя через `/api/v1/users/{username}/` '
+            'права применяются сразу, без ожидания сброса кэша аутентификации'
+        )
+        user.is_active = False
+        user.save()
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == 401, (
+            'Проверьте, что деактивированный пользователь не проходит аутентификацию'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_13_users_demotion_in_other_process(self, admin_client, admin):
+        from api.authentication import user_version_name
+        from reviews.versions import bump_version
+
+        assert admin_client.get('/api/v1/users/').status_code == 200
+        # другой процесс понижает роль: его сигналы меняют общую версию
+        # пользователя, но не локальный кэш этого процесса
+        get_user_model().objects.filter(pk=admin.pk).update(
+            role='user', is_superuser=False, is_staff=False)
+        bump_version(user_version_name(admin.pk))
+        assert admin_client.get('/api/v1/users/').status_code == 403, (
+            'Проверьте, что смена роли в другом процессе сразу сбрасывает '
+            'кэш аутентификации'
+        )
+        get_user_model().objects.filter(pk=admin.pk).update(is_active=False)
+        bump_version(user_version_name(admin.pk))
+        assert admin_client.get('/api/v1/users/me/').status_code == 401
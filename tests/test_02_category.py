@@ -178,3 +178,41 @@ class Test02CategoryAPI:
             f'Проверьте, что при POST запросе на `{url}`, создание категорий недоступно для '
             f'пользователя с ролью moderator'
         )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_category_list_cache(self, client, admin_client,
+                                    django_assert_num_queries):
+        create_categories(admin_client)
+        response = client.get('/api/v1/categories/')
+        assert response['X-Cache'] == 'MISS'
+        # только версия коллекции, общая для всех процессов
+        with django_assert_num_queries(1):
+            cached = client.get('/api/v1/categories/')
+        assert cached['X-Cache'] == 'HIT' and cached.json() == response.json(), (
+            'Проверьте, что повторный GET запрос `/api/v1/categories/` '
+            'отдается из кэша без запроса списка к БД'
+        )
+        assert client.get('/api/v1/categories/?search=Фильм')['X-Cache'] == 'MISS', (
+            'Проверьте, что ключ кэша учитывает параметры запроса'
+        )
+        admin_client.post('/api/v1/categories/', data={'name': 'Музыка', 'slug': 'music'})
+        response = client.get('/api/v1/categories/')
+        assert response['X-Cache'] == 'MISS' and response.json()['count'] == 3, (
+            'Проверьте, что кэш списка категорий сбрасывается при создании категории'
+        )
+        admin_client.delete('/api/v1/categories/music/')
+        assert client.get('/api/v1/categories/').json()['count'] == 2, (
+            'Проверьте, что кэш списка категорий сбрасывается при удалении категории'
+        )
+        stats = admin_client.get('/api/v1/cache/stats/').json()
+        assert stats['hits'] == 1 and stats['misses'] == 4
+
+        from django.db.models import F
+        from reviews.models import CollectionVersion
+
+        assert client.get('/api/v1/categories/')['X-Cache'] == 'HIT'
+        # изменение версий другим процессом
+        CollectionVersion.objects.update(value=F('value') + 1)
+        assert client.get('/api/v1/categories/')['X-Cache'] == 'MISS', (
+            'Проверьте, что версии кэша общие для всех процессов'
+        )
@@ -1,7 +1,7 @@
 import pytest
 
 from .common import (auth_client, create_categories, create_genre,
-                     create_titles, create_users_api)
+                     create_reviews, create_titles, create_users_api)
 
 
 class Test04TitleAPI:
@@ -249,3 +249,151 @@ class Test04TitleAPI:
         user, moderator = create_users_api(admin_client)
         self.check_permissions(user, 'обычного пользователя', titles, categories, genres)
         self.check_permissions(moderator, 'модератора', titles, categories, genres)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_titles_search(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = client.get('/api/v1/titles/?name=туд')
+        data = response.json()
+        assert [title['id'] for title in data['results']] == [titles[0]['id']], (
+            'Проверьте, что при GET запросе `/api/v1/titles/` параметр `name` '
+            'ищет по началу любого слова названия без учета регистра'
+        )
+        response = client.get('/api/v1/titles/?q=ДРАМА')
+        data = response.json()
+        assert [title['id'] for title in data['results']] == [titles[1]['id']], (
+            'Проверьте, что при GET запросе `/api/v1/titles/` параметр `q` '
+            'ищет по названию и описанию произведения без учета регистра'
+        )
+        admin_client.patch(f'/api/v1/titles/{titles[1]["id"]}/', data={'name': 'Ёлка'})
+        response = client.get('/api/v1/titles/?q=елка')
+        data = response.json()
+        assert [title['id'] for title in data['results']] == [titles[1]['id']], (
+            'Проверьте, что поисковый индекс обновляется при изменении произведения '
+            'и не различает `е` и `ё`'
+        )
+        response = client.get('/api/v1/titles/?q=Проект')
+        assert response.json()['count'] == 0, (
+            'Проверьте, что из поискового индекса удаляется старое название'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_titles_facets(self, client, admin_client):
+        from reviews.facets import grouped_counts, stored_counts
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        response = client.get('/api/v1/titles/?facets=genre,category,year')
+        facets = response.json()['facets']
+        assert facets['year'] == [{'value': 2000, 'count': 1}, {'value': 2020, 'count': 1}], (
+            'Проверьте, что `?facets=year` возвращает количество произведений по годам'
+        )
+        assert {item['slug']: item['count'] for item in facets['genre']} == {
+            'horror': 1, 'comedy': 1, 'drama': 1
+        }, 'Проверьте, что `?facets=genre` возвращает количество произведений по жанрам'
+        assert facets['category'][0].keys() == {'name', 'slug', 'count'}
+
+        response = client.get('/api/v1/titles/?facets=genre&year=2000')
+        facets = response.json()['facets']
+        assert list(facets) == ['genre']
+        assert {item['slug'] for item in facets['genre']} == {'horror', 'comedy'}, (
+            'Проверьте, что с фильтрами фасеты считаются по отфильтрованной выборке'
+        )
+
+        admin_client.patch(f'/api/v1/titles/{titles[0]["id"]}/',
+                           data={'genre': ['drama'], 'category': 'books', 'year': 2020})
+        admin_client.delete('/api/v1/genres/comedy/')
+        admin_client.delete(f'/api/v1/titles/{titles[1]["id"]}/')
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Третье', 'year': 2000, 'genre': ['horror', 'drama'], 'category': 'films'})
+        assert stored_counts() == grouped_counts(Title.objects.all()), (
+            'Проверьте, что счетчики фасетов поддерживаются при изменении и удалении '
+            'произведений и жанров'
+        )
+        assert client.get('/api/v1/titles/').json().get('facets') is None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_titles_bulk_create(self, client, admin_client,
+                                   django_assert_max_num_queries):
+        from reviews.facets import grouped_counts, stored_counts
+        from reviews.models import Title
+
+        create_titles(admin_client)
+        url = '/api/v1/titles/bulk/'
+        items = [
+            {'name': f'Пакет {i}', 'year': 2001, 'genre': ['drama', 'comedy'],
+             'category': 'books', 'description': 'Из пакета'}
+            for i in range(20)
+        ]
+        items.insert(3, {'name': 'Без года', 'genre': ['drama'], 'category': 'books'})
+        items.insert(5, {'name': 'Чужой жанр', 'year': 2001,
+                         'genre': ['drama', 'unknown'], 'category': 'nothing'})
+        assert client.post(url, data=items, content_type='application/json').status_code == 401
+        # пользователь, slug жанров и категорий, вставки, счетчики фасетов,
+        # журнал изменений, версии и ответ: число запросов не зависит от
+        # размера пакета
+        with django_assert_max_num_queries(18):
+            response = admin_client.post(url, data=items, format='json')
+        assert response.status_code == 201, (
+            'Проверьте, что POST запрос `/api/v1/titles/bulk/` создает произведения'
+        )
+        data = response.json()
+        assert [item['index'] for item in data['created']] == [
+            i for i in range(22) if i not in (3, 5)]
+        created = data['created'][0]
+        assert created['name'] == 'Пакет 0' and created['rating'] is None
+        assert [genre['slug'] for genre in created['genre']] == ['drama', 'comedy']
+        assert [error['index'] for error in data['errors']] == [3, 5], (
+            'Проверьте, что ошибки возвращаются для каждого некорректного элемента'
+        )
+        assert 'year' in data['errors'][0]['errors']
+        assert set(data['errors'][1]['errors']) == {'genre', 'category'}
+        assert Title.objects.count() == 22
+        assert client.get(f'/api/v1/titles/{created["id"]}/').json()['name'] == 'Пакет 0'
+        assert client.get('/api/v1/titles/?q=Пакет').json()['count'] == 20, (
+            'Проверьте, что созданные пакетом произведения попадают в поисковый индекс'
+        )
+        assert stored_counts() == grouped_counts(Title.objects.all()), (
+            'Проверьте, что пакетное создание учитывается в счетчиках фасетов'
+        )
+        response = admin_client.post(url, data={'name': 'Одно'}, format='json')
+        assert response.status_code == 400
+        response = admin_client.post(url, data=items[3:4], format='json')
+        assert response.status_code == 400 and response.json()['created'] == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_08_titles_ordering_by_rating(self, client, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        admin_client.post(f'/api/v1/titles/{titles[1]["id"]}/reviews/',
+                          data={'text': 'Шедевр', 'score': 10})
+        ids = [titles[1]['id'], titles[0]['id']]
+        response = client.get('/api/v1/titles/?ordering=-rating')
+        assert [title['id'] for title in response.json()['results']] == ids, (
+            'Проверьте, что `?ordering=-rating` сортирует произведения по '
+            'убыванию средней оценки'
+        )
+        response = client.get('/api/v1/titles/?ordering=rating')
+        assert [title['id'] for title in response.json()['results']] == ids[::-1]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_09_titles_bulk_create_reselects_ids(self, client, admin_client,
+                                                 monkeypatch):
+        from django.db import connection
+
+        create_titles(admin_client)
+        # ветка для БД без RETURNING, кроме SQLite
+        monkeypatch.setattr(connection, 'vendor', 'other')
+        items = [
+            {'name': 'Двойник', 'year': 2001, 'genre': ['drama'], 'category': 'books'},
+            {'name': 'Двойник', 'year': 2001, 'genre': ['comedy'], 'category': 'books'},
+            {'name': 'Другой', 'year': 2002, 'genre': ['drama', 'comedy']},
+        ]
+        response = admin_client.post('/api/v1/titles/bulk/', data=items, format='json')
+        assert response.status_code == 201
+        for item, created in zip(items, response.json()['created']):
+            title = client.get(f'/api/v1/titles/{created["id"]}/').json()
+            assert (title['name'], [genre['slug'] for genre in title['genre']]) == (
+                item['name'], item['genre']), (
+                'Проверьте, что созданные пакетом произведения получают свои id '
+                'и жанры на БД без RETURNING'
+            )
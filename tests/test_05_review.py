@@ -334,3 +334,117 @@ class Test05ReviewAPI:
             'без токена авторизации возвращается статус 401'
         )
         self.check_permissions(user, 'обычного пользователя', reviews, titles)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_reviews_keyset_pagination(self, client, admin_client, admin,
+                                          django_user_model):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        for i in range(4):
+            author = django_user_model.objects.create_user(
+                username=f'reader{i}', email=f'reader{i}@yamdb.fake')
+            response = auth_client(author).post(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+                data={'text': f'review {i}', 'score': 6}
+            )
+            reviews.append({'id': response.json()['id']})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/?pagination=cursor'
+        ids = []
+        pages = 0
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200, (
+                'Проверьте, что при GET запросе `/api/v1/titles/{title_id}/reviews/?pagination=cursor` '
+                'возвращается статус 200'
+            )
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что курсорная пагинация не выполняет подсчет всех отзывов'
+            )
+            ids += [review['id'] for review in data['results']]
+            url = data['next']
+            pages += 1
+        assert pages == 2 and ids == [review['id'] for review in reviews], (
+            'Проверьте, что курсорная пагинация возвращает все отзывы по порядку '
+            'публикации без пропусков и повторов'
+        )
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/?cursor=invalid')
+        assert response.status_code == 404, (
+            'Проверьте, что при неверном курсоре возвращается статус 404'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_reviews_list_queries(self, client, admin_client, admin,
+                                     django_assert_num_queries):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        # версии для ETag, произведение, count, отзывы вместе с авторами
+        with django_assert_num_queries(4):
+            response = client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/')
+        assert len(response.json()['results']) == len(reviews), (
+            'Проверьте, что авторы отзывов загружаются одним запросом вместе с отзывами'
+        )
+        with django_assert_num_queries(3):
+            client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/?pagination=cursor')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_reviews_score_histogram(self, client, admin_client, admin):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        from reviews.models import Title
+
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+
+        def scores():
+            data = client.get(url).json()['scores']
+            return {score: count for score, count in data.items() if count}
+
+        assert scores() == {'3': 1, '4': 1, '5': 1}, (
+            'Проверьте, что страница произведения содержит распределение оценок'
+        )
+        assert 'scores' not in client.get('/api/v1/titles/').json()['results'][0]
+        admin_client.patch(f'{url}reviews/{reviews[0]["id"]}/', data={'score': 10})
+        admin_client.delete(f'{url}reviews/{reviews[1]["id"]}/')
+        assert scores() == {'4': 1, '10': 1}, (
+            'Проверьте, что распределение оценок обновляется при изменении '
+            'и удалении отзывов'
+        )
+        Title.objects.update(score_4=0, score_10=7, rating_sum=0, rating_count=0)
+        call_command('rebuild_aggregates', stdout=StringIO())
+        assert scores() == {'4': 1, '10': 1}, (
+            'Проверьте, что команда rebuild_aggregates пересчитывает распределение оценок'
+        )
+        assert client.get(url).json()['rating'] == 7
+
+    @pytest.mark.django_db(transaction=True)
+    def test_08_review_integrity_error(self, admin_client, admin):
+        from django.db import IntegrityError
+
+        from api.serializers import ReviewSerializer
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(id=titles[0]['id'])
+        Title.objects.filter(id=title.id).delete()
+        serializer = ReviewSerializer(data={'text': 'Поздно', 'score': 5})
+        assert serializer.is_valid()
+        with pytest.raises(IntegrityError):
+            serializer.save(author=admin, title=title)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_09_title_save_keeps_aggregates(self, admin_client, admin):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(id=titles[0]['id'])
+        admin_client.post(f'/api/v1/titles/{title.id}/reviews/',
+                          data={'text': 'Отлично', 'score': 9})
+        title.name = 'Новое название'
+        title.save()
+        title = Title.objects.get(id=title.id)
+        assert (title.name, title.rating_sum, title.rating_count,
+                title.score_9) == ('Новое название', 9, 1, 1), (
+            'Проверьте, что сохранение произведения не затирает агрегаты '
+            'оценок, изменившиеся после его загрузки'
+        )
@@ -246,3 +246,32 @@ class Test06CommentAPI:
             'без токена авторизации возвращается статус 401'
         )
         self.check_permissions(user, 'обычного пользователя', f'{pre_url}{comments[2]["id"]}/')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_comment_review_from_other_title(self, client, admin_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[1]["id"]}/reviews/{reviews[0]["id"]}/comments/'
+        response = client.get(url)
+        assert response.status_code == 404, (
+            'Проверьте, что при GET запросе `/api/v1/titles/{title_id}/reviews/{review_id}/comments/` '
+            'для отзыва другого произведения возвращается статус 404'
+        )
+        response = admin_client.post(url, data={'text': 'Не туда'})
+        assert response.status_code == 404, (
+            'Проверьте, что нельзя добавить комментарий к отзыву через URL другого произведения'
+        )
+        response = client.get(f'{url}{comments[0]["id"]}/')
+        assert response.status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_comments_list_queries(self, client, admin_client, admin,
+                                      django_assert_num_queries):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/'
+        # версии для ETag, отзыв с произведением, count, комментарии
+        # вместе с авторами
+        with django_assert_num_queries(4):
+            response = client.get(url)
+        assert len(response.json()['results']) == len(comments), (
+            'Проверьте, что авторы комментариев загружаются одним запросом вместе с комментариями'
+        )
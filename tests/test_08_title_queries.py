@@ -0,0 +1,182 @@
+import pytest
+
+from .common import create_reviews, create_titles
+
+
+class Test08TitleQueriesAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_title_list_queries(self, client, admin_client,
+                                   django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        for i in range(3):
+            admin_client.post('/api/v1/titles/', data={
+                'name': f'Сиквел {i}', 'year': 2001,
+                'genre': titles[0]['genre'], 'category': titles[0]['category']
+            })
+        # версии для ETag, count, произведения с категориями, жанры
+        with django_assert_num_queries(4):
+            response = client.get('/api/v1/titles/')
+        assert len(response.json()['results']) == 5, (
+            'Проверьте, что при GET запросе `/api/v1/titles/` '
+            'возвращается страница произведений'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_title_detail_queries(self, client, admin_client,
+                                     django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        # версии для ETag, произведение с категорией, жанры
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.status_code == 200
+        assert len(response.json()['genre']) == 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_title_create_queries(self, admin_client,
+                                     django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        data = {'name': 'Новое', 'year': 2010,
+                'genre': titles[0]['genre'], 'category': titles[0]['category']}
+        # 2 жанра, категория, вставка произведения,
+        # связи с жанрами (BEGIN и 3 запроса), жанры для ответа,
+        # счетчики фасетов (категория, жанры, новый год - 4 запроса),
+        # журнал изменений (создание и жанры), версии кэшей (создание
+        # версии нового произведения - 3 запроса, изменение жанров -
+        # 2 запроса); поля пользователя берутся из кэша аутентификации
+        # после проверки его версии
+        with django_assert_num_queries(23):
+            response = admin_client.post('/api/v1/titles/', data=data)
+        assert response.status_code == 201
+        assert len(response.json()['genre']) == 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_title_list_authenticated_queries(self, admin_client,
+                                                 django_assert_num_queries):
+        create_titles(admin_client)
+        # версия пользователя вместе с версиями для ETag (поля берутся
+        # из кэша аутентификации), count, произведения, жанры
+        with django_assert_num_queries(4):
+            response = admin_client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        with django_assert_num_queries(1):
+            response = admin_client.get(
+                '/api/v1/titles/', HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == 304, (
+            'Проверьте, что аутентифицированный запрос читает версию '
+            'пользователя одним запросом с версиями для ETag'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_title_sparse_fields(self, client, admin_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        titles, _, _ = create_titles(admin_client)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/?fields=id,name,rating')
+        assert set(response.json()['results'][0]) == {'id', 'name', 'rating'}, (
+            'Проверьте, что параметр `fields` оставляет в ответе только запрошенные поля'
+        )
+        # версии для ETag, count и произведения, без жанров и категорий
+        assert len(context.captured_queries) == 3
+        assert 'description' not in context.captured_queries[-1]['sql'], (
+            'Проверьте, что незапрошенные поля не загружаются из БД'
+        )
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/?fields=genre,category')
+        assert response.json() == {
+            'genre': [{'name': 'Комедия', 'slug': 'comedy'},
+                      {'name': 'Ужасы', 'slug': 'horror'}],
+            'category': {'name': 'Фильм', 'slug': 'films'},
+        }
+        response = client.get('/api/v1/titles/?fields=unknown')
+        assert 'description' in response.json()['results'][0], (
+            'Проверьте, что без известных полей в `fields` возвращаются все поля'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_title_fast_read_matches_serializer(self, client, admin_client,
+                                                   admin, monkeypatch):
+        from api.views import TitleViewSet
+
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Без категории', 'year': 1999, 'genre': titles[1]['genre'],
+            'category': titles[1]['category'], 'description': 'Будет удалена'
+        })
+        admin_client.delete(f'/api/v1/categories/{titles[1]["category"]}/')
+        urls = [
+            '/api/v1/titles/',
+            '/api/v1/titles/?genre=drama',
+            '/api/v1/titles/?fields=rating,name,genre',
+            f'/api/v1/titles/{titles[0]["id"]}/',
+            f'/api/v1/titles/{titles[1]["id"]}/?fields=category,id',
+            f'/api/v1/titles/?ids={titles[1]["id"]},{titles[0]["id"]},999',
+        ]
+        fast = [client.get(url).content for url in urls]
+        monkeypatch.setattr(TitleViewSet, 'fast_read', False)
+        slow = [client.get(url).content for url in urls]
+        for url, fast_body, slow_body in zip(urls, fast, slow):
+            assert fast_body == slow_body, (
+                f'Проверьте, что быстрое представление `{url}` '
+                'побайтно совпадает с выводом TitleSerializer'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_title_batch_fetch(self, client, admin_client,
+                                  django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        ids = f'{titles[1]["id"]},999,{titles[0]["id"]},{titles[1]["id"]}'
+        # версии для ETag, произведения с категориями, жанры
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/?ids={ids}')
+        assert response.status_code == 200
+        data = response.json()
+        assert [title['id'] for title in data['results']] == [
+            titles[1]['id'], titles[0]['id']], (
+            'Проверьте, что `?ids=` возвращает произведения в порядке запроса'
+        )
+        assert data['missing'] == [999], (
+            'Проверьте, что `?ids=` перечисляет отсутствующие id в `missing`'
+        )
+        assert data['results'][1]['genre'] == [
+            {'name': 'Комедия', 'slug': 'comedy'},
+            {'name': 'Ужасы', 'slug': 'horror'},
+        ]
+        response = client.get(f'/api/v1/titles/?ids={ids}&fields=name')
+        assert response.json()['results'] == [{'name': 'Проект'}, {'name': 'Поворот туда'}]
+        assert client.get('/api/v1/titles/?ids=1,abc').status_code == 400
+        assert client.get('/api/v1/titles/?ids=').status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_08_title_page(self, client, admin_client, admin,
+                           django_assert_num_queries):
+        from .common import create_comments
+
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/page/'
+        # произведение с категорией, отзывы с авторами и количеством
+        # комментариев, жанры
+        with django_assert_num_queries(3):
+            response = client.get(f'{url}?reviews=2')
+        assert response.status_code == 200, (
+            'Проверьте, что `/api/v1/titles/{title_id}/page/` доступен без авторизации'
+        )
+        data = response.json()
+        assert data['title'] == client.get(f'/api/v1/titles/{titles[0]["id"]}/').json(), (
+            'Проверьте, что страница содержит произведение в формате детального ответа'
+        )
+        page = data['reviews']
+        assert page['count'] == len(reviews)
+        assert [review['id'] for review in page['results']] == [
+            review['id'] for review in reviews[:2]]
+        assert page['results'][0]['author'] == reviews[0]['author']
+        assert [review['comments_count'] for review in page['results']] == [len(comments), 0], (
+            'Проверьте, что для отзывов возвращается количество комментариев'
+        )
+        rest = client.get(page['next']).json()
+        assert [review['id'] for review in rest['results']] == [reviews[2]['id']], (
+            'Проверьте, что ссылка `next` продолжает список отзывов'
+        )
+        assert client.get(url).json()['reviews']['next'] is None
+        assert client.get('/api/v1/titles/999/page/').status_code == 404
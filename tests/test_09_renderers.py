@@ -0,0 +1,60 @@
+import datetime as dt
+import json
+from decimal import Decimal
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from .common import create_titles
+
+
+class Test09RenderersAPI:
+
+    def test_01_fast_renderer_matches_drf(self):
+        from api.renderers import FastJSONRenderer
+
+        data = {
+            'name': 'Поворот туда', 'rating': Decimal('7.5'), 'score': 3.25,
+            'pub_date': dt.datetime(2020, 1, 13, 23, 20, 2, 422000, tzinfo=dt.timezone.utc),
+            'day': dt.date(2020, 1, 13), 'message': gettext_lazy('Текст'),
+            'genre': [{'name': 'Драма', 'slug': 'drama'}], 'category': None,
+        }
+        fast = FastJSONRenderer().render(data)
+        expected = JSONRenderer().render(
+            dict(data, pub_date='2020-01-13T23:20:02.422000Z'))
+        assert fast == expected, (
+            'Проверьте, что быстрый JSON-рендерер выводит те же байты, что JSONRenderer DRF'
+        )
+
+    def test_02_fast_renderer_separators_and_floats(self):
+        from api.renderers import FastJSONRenderer
+
+        data = {'text': 'строка\u2028абзац\u2029конец', 'values': [1e16, 1e-7, 0.1]}
+        fast = FastJSONRenderer().render({'text': data['text']})
+        assert fast == JSONRenderer().render({'text': data['text']}), (
+            'Проверьте, что U+2028 и U+2029 экранируются так же, как в JSONRenderer DRF'
+        )
+        assert b'\\u2028' in fast and '\u2028'.encode() not in fast
+        assert json.loads(FastJSONRenderer().render(data)) == json.loads(
+            JSONRenderer().render(data)), (
+            'Проверьте, что числа с экспонентой кодируются тем же значением'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_fast_parser(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = admin_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data={'text': 'Ёмко', 'score': 9}, format='json'
+        )
+        assert response.status_code == 201 and response.json()['text'] == 'Ёмко', (
+            'Проверьте, что API принимает JSON в теле запроса'
+        )
+        response = admin_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data='{"text": ', content_type='application/json'
+        )
+        assert response.status_code == 400, (
+            'Проверьте, что некорректный JSON в теле запроса возвращает статус 400'
+        )
@@ -0,0 +1,62 @@
+import gzip
+
+import pytest
+
+from .common import create_titles
+
+
+class Test10CompressionAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_gzip_title_list(self, client, admin_client):
+        from api.middleware import compressed_cache
+
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(f'/api/v1/titles/{titles[0]["id"]}/',
+                           data={'description': 'Очень длинное описание. ' * 50})
+        plain = client.get('/api/v1/titles/')
+        assert 'Content-Encoding' not in plain, (
+            'Проверьте, что без Accept-Encoding ответ не сжимается'
+        )
+        response = client.get('/api/v1/titles/', HTTP_ACCEPT_ENCODING='br;q=0, gzip')
+        assert response['Content-Encoding'] == 'gzip', (
+            'Проверьте, что при Accept-Encoding: gzip ответ `/api/v1/titles/` сжимается'
+        )
+        assert 'Accept-Encoding' in response['Vary']
+        assert gzip.decompress(response.content) == plain.content
+        assert response['ETag'].startswith('W/')
+        hits = compressed_cache.hits
+        client.get('/api/v1/titles/', HTTP_ACCEPT_ENCODING='gzip')
+        assert compressed_cache.hits == hits + 1, (
+            'Проверьте, что повторный ответ с тем же ETag берется из кэша сжатых тел'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_small_and_exempt_responses(self, client, user, settings):
+        from django.contrib.auth.tokens import default_token_generator
+
+        response = client.get('/api/v1/categories/', HTTP_ACCEPT_ENCODING='gzip')
+        assert 'Content-Encoding' not in response, (
+            'Проверьте, что ответы меньше порога не сжимаются'
+        )
+        settings.COMPRESSION_MIN_SIZE = 0
+        data = {'username': user.username,
+                'confirmation_code': default_token_generator.make_token(user)}
+        response = client.post('/api/v1/auth/token/', data=data, HTTP_ACCEPT_ENCODING='gzip')
+        assert response.status_code == 200
+        assert 'Content-Encoding' not in response, (
+            'Проверьте, что ответы с токеном не сжимаются'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_compressed_cache_varies_by_user(self, user, moderator, user_client,
+                                                moderator_client):
+        headers = {'HTTP_ACCEPT': 'text/html', 'HTTP_ACCEPT_ENCODING': 'gzip'}
+        first = user_client.get('/api/v1/titles/', **headers)
+        assert first['Content-Encoding'] == 'gzip'
+        assert user.username in gzip.decompress(first.content).decode()
+        second = moderator_client.get('/api/v1/titles/', **headers)
+        page = gzip.decompress(second.content).decode()
+        assert moderator.username in page and user.username not in page, (
+            'Проверьте, что сжатый ответ одного пользователя не отдается другому'
+        )
@@ -0,0 +1,121 @@
+import pytest
+
+from .common import auth_client, create_comments, create_titles
+
+
+class Test11ConditionalGetAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_not_modified(self, client, admin_client,
+                                    django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/'
+        response = client.get(url)
+        etag = response['ETag']
+        assert 'Authorization' in response['Vary'], (
+            'Проверьте, что ответ `/api/v1/titles/` содержит Vary: Authorization'
+        )
+        # только версии коллекций
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что при совпадении If-None-Match возвращается 304 без запроса данных'
+        )
+        assert response['ETag'] == etag
+        assert client.get(url, HTTP_IF_NONE_MATCH=f'W/{etag}').status_code == 304, (
+            'Проверьте, что If-None-Match сравнивается со слабым ETag'
+        )
+        assert client.get(f'{url}?year=2000')['ETag'] != etag, (
+            'Проверьте, что ETag зависит от параметров запроса'
+        )
+
+        detail = f'{url}{titles[0]["id"]}/'
+        detail_etag = client.get(detail)['ETag']
+        admin_client.patch(f'{url}{titles[1]["id"]}/', data={'name': 'Новое'})
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            'Проверьте, что изменение произведения меняет ETag списка'
+        )
+        assert client.get(detail, HTTP_IF_NONE_MATCH=detail_etag).status_code == 304, (
+            'Проверьте, что изменение другого произведения не меняет ETag произведения'
+        )
+        admin_client.delete('/api/v1/genres/horror/')
+        assert client.get(detail, HTTP_IF_NONE_MATCH=detail_etag).status_code == 200, (
+            'Проверьте, что изменение жанров меняет ETag произведения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_and_comments_not_modified(self, client, admin_client, admin):
+        comments, reviews, titles, user, _ = create_comments(admin_client, admin)
+        title_id = titles[0]['id']
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        reviews_etag = client.get(reviews_url)['ETag']
+        comments_etag = client.get(comments_url)['ETag']
+        assert client.get(reviews_url, HTTP_IF_NONE_MATCH=reviews_etag).status_code == 304
+
+        auth_client(user).post(comments_url, data={'text': 'Еще один'})
+        assert client.get(reviews_url, HTTP_IF_NONE_MATCH=reviews_etag).status_code == 304, (
+            'Проверьте, что новый комментарий не меняет ETag списка отзывов'
+        )
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=comments_etag)
+        assert response.status_code == 200, (
+            'Проверьте, что новый комментарий меняет ETag списка комментариев'
+        )
+        comments_etag = response['ETag']
+
+        admin_client.patch(f'/api/v1/users/{user.username}/', data={'first_name': 'Имя'})
+        client.post('/api/v1/auth/signup/', data={'username': 'newbie',
+                                                  'email': 'newbie@yamdb.fake'})
+        assert client.get(comments_url, HTTP_IF_NONE_MATCH=comments_etag).status_code == 304, (
+            'Проверьте, что регистрация и изменение полей пользователя, кроме имени, '
+            'не меняют ETag ответов с авторами'
+        )
+        admin_client.patch(f'/api/v1/users/{user.username}/', data={'username': 'renamed'})
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=comments_etag)
+        assert response.status_code == 200, (
+            'Проверьте, что изменение имени пользователя меняет ETag ответов с авторами'
+        )
+        assert 'renamed' in [comment['author'] for comment in response.json()['results']]
+        reviews_etag = client.get(reviews_url)['ETag']
+        admin_client.delete(f'{reviews_url}{reviews[1]["id"]}/')
+        assert client.get(reviews_url, HTTP_IF_NONE_MATCH=reviews_etag).status_code == 200, (
+            'Проверьте, что удаление отзыва меняет ETag списка отзывов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_versions_bumped_on_commit(self, client, admin_client):
+        from django.db import transaction
+
+        from reviews.models import Title
+        from reviews.versions import TITLES, get_version
+
+        titles, _, _ = create_titles(admin_client)
+        etag = client.get('/api/v1/titles/')['ETag']
+        version = get_version(TITLES)
+        with transaction.atomic():
+            Title.objects.get(id=titles[0]['id']).save()
+            assert get_version(TITLES) == version, (
+                'Проверьте, что версия не меняется до фиксации транзакции'
+            )
+        assert get_version(TITLES) != version
+        assert client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+        version = get_version(TITLES)
+        with pytest.raises(RuntimeError), transaction.atomic():
+            Title.objects.get(id=titles[0]['id']).save()
+            raise RuntimeError
+        assert get_version(TITLES) == version, (
+            'Проверьте, что откат транзакции не меняет версию'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_deleted_title_reviews_not_cached(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        etag = client.get(url)['ETag']
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 404, (
+            'Проверьте, что после удаления произведения без отзывов старый '
+            'ETag списка отзывов не дает ответ 304'
+        )
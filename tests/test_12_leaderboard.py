@@ -0,0 +1,112 @@
+import pytest
+
+from .common import auth_client, create_reviews
+
+
+class Test12LeaderboardAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_top_titles(self, client, admin_client, admin, django_user_model,
+                           django_assert_num_queries):
+        from reviews.leaderboard import ALL, build_leaderboard, get_leaderboard
+
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        admin_client.post(f'/api/v1/titles/{titles[1]["id"]}/reviews/',
+                          data={'text': 'Шедевр', 'score': 10})
+        response = client.get('/api/v1/titles/top/')
+        assert response.status_code == 200, (
+            'Проверьте, что `/api/v1/titles/top/` доступен без авторизации'
+        )
+        data = response.json()
+        assert [title['id'] for title in data] == [titles[1]['id'], titles[0]['id']], (
+            'Проверьте, что произведения упорядочены по байесовскому среднему'
+        )
+        assert data[0]['score'] == round((10 + 10 * 5.5) / 11, 2)
+        assert data[0]['rating'] == 10
+
+        for username, score in (('first', 1), ('second', 1), ('third', 2)):
+            new_user = django_user_model.objects.create(
+                username=username, email=f'{username}@yamdb.fake')
+            auth_client(new_user).post(f'/api/v1/titles/{titles[1]["id"]}/reviews/',
+                                       data={'text': 'Плохо', 'score': score})
+        # версия рейтингов, произведения с категориями, жанры
+        with django_assert_num_queries(3):
+            data = client.get('/api/v1/titles/top/').json()
+        assert [title['id'] for title in data] == [titles[0]['id'], titles[1]['id']], (
+            'Проверьте, что рейтинг лучших обновляется при изменении отзывов '
+            'без перестроения списка'
+        )
+        assert get_leaderboard(ALL) == build_leaderboard(ALL)['items']
+
+        response = client.get('/api/v1/titles/top/?genre=drama&limit=1')
+        assert [title['id'] for title in response.json()] == [titles[1]['id']], (
+            'Проверьте, что параметр `genre` ограничивает рейтинг жанром'
+        )
+        assert client.get('/api/v1/titles/top/?category=unknown').status_code == 404
+        assert client.get('/api/v1/titles/top/?genre=drama&category=books').status_code == 400
+
+    def test_02_leaderboard_slack(self, settings):
+        from reviews.leaderboard import place
+
+        settings.LEADERBOARD_SIZE = 2
+        settings.LEADERBOARD_SLACK = 1
+        board = {'complete': False, 'items': [(1, 9.0), (2, 8.0), (3, 7.0)]}
+        board = place(board, 4, 8.5)
+        assert board['items'] == [(1, 9.0), (4, 8.5), (2, 8.0)], (
+            'Проверьте, что список ограничен размером и запасом'
+        )
+        board = place(board, 1, 6.0)
+        assert board['items'] == [(4, 8.5), (2, 8.0)], (
+            'Проверьте, что опустившееся за границу произведение выпадает из списка'
+        )
+        assert place(board, 2, 1.0) is None, (
+            'Проверьте, что список без запаса перестраивается'
+        )
+        complete = {'complete': True, 'items': [(1, 9.0)]}
+        assert place(complete, 2, 1.0)['items'] == [(1, 9.0), (2, 1.0)]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_leaderboard_timeout(self, client, admin_client, admin, settings):
+        from reviews.models import Title
+
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        settings.LEADERBOARD_TIMEOUT = 0
+        data = client.get('/api/v1/titles/top/').json()
+        assert data[0]['id'] == titles[0]['id']
+        # отзывы изменены другим процессом: его сигналы обновили только
+        # списки в его кэше
+        Title.objects.filter(pk=titles[1]['id']).update(
+            rating_sum=100, rating_count=10)
+        data = client.get('/api/v1/titles/top/').json()
+        assert data[0]['id'] == titles[1]['id'], (
+            'Проверьте, что списки лучших хранятся в кэше не дольше '
+            '`LEADERBOARD_TIMEOUT`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_leaderboard_refresh_on_commit(self, client, admin_client, admin,
+                                              user):
+        from django.db import connection, transaction
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.leaderboard import ALL, build_leaderboard, get_leaderboard
+        from reviews.models import Review, Title
+
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        with CaptureQueriesContext(connection) as context:
+            admin_client.post(f'/api/v1/titles/{titles[1]["id"]}/reviews/',
+                              data={'text': 'Неплохо', 'score': 6})
+        assert not any('reviews_title_genre' in query['sql']
+                       for query in context.captured_queries), (
+            'Проверьте, что без закэшированных списков изменение отзыва '
+            'не читает данные для рейтинга лучших'
+        )
+        client.get('/api/v1/titles/top/')
+        with pytest.raises(RuntimeError), transaction.atomic():
+            Review.objects.create(author=user, score=10, text='Отменено',
+                                  title=Title.objects.get(pk=titles[1]['id']))
+            raise RuntimeError
+        assert get_leaderboard(ALL) == build_leaderboard(ALL)['items'], (
+            'Проверьте, что отмененное изменение отзыва не попадает в '
+            'рейтинг лучших'
+        )
@@ -0,0 +1,72 @@
+import pytest
+
+from .common import create_reviews, create_titles
+
+
+class Test13ChangesAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_changes_since(self, client, admin_client, admin, settings,
+                              django_assert_num_queries):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        response = client.get('/api/v1/changes/')
+        assert response.status_code == 200, (
+            'Проверьте, что `/api/v1/changes/` доступен без авторизации'
+        )
+        cursor = response.json()['cursor']
+        assert response.json()['results'] == []
+
+        title_id = titles[0]['id']
+        admin_client.patch(f'/api/v1/titles/{title_id}/', data={'name': 'Новое'})
+        admin_client.patch(f'/api/v1/titles/{title_id}/', data={'year': 1999})
+        admin_client.delete(f'/api/v1/titles/{titles[1]["id"]}/')
+        admin_client.post('/api/v1/genres/', data={'name': 'Мюзикл', 'slug': 'musical'})
+
+        with django_assert_num_queries(4):
+            response = client.get(f'/api/v1/changes/?since={cursor}')
+        assert response.status_code == 200
+        data = response.json()
+        changes = {(item['model'], item['id']): item for item in data['results']}
+        assert changes[('title', title_id)]['action'] == 'updated', (
+            'Проверьте, что для объекта возвращается последнее изменение'
+        )
+        assert changes[('title', title_id)]['data']['year'] == 1999
+        assert changes[('title', title_id)]['data']['name'] == 'Новое'
+        assert changes[('title', titles[1]['id'])]['action'] == 'deleted'
+        assert changes[('title', titles[1]['id'])]['data'] is None, (
+            'Проверьте, что для удаленных объектов данные не возвращаются'
+        )
+        genre = [item for (model, _), item in changes.items() if model == 'genre']
+        assert len(genre) == 1 and genre[0]['data']['slug'] == 'musical'
+        assert data['has_more'] is False
+
+        response = client.get(f'/api/v1/changes/?since={data["cursor"]}')
+        assert response.json() == {'cursor': data['cursor'], 'has_more': False,
+                                   'results': []}, (
+            'Проверьте, что после последнего курсора изменений нет'
+        )
+
+        settings.CHANGES_PAGE_SIZE = 1
+        data = client.get(f'/api/v1/changes/?since={cursor}').json()
+        assert len(data['results']) == 1 and data['has_more'] is True, (
+            'Проверьте, что журнал отдается страницами'
+        )
+        assert data['cursor'] > cursor
+        assert client.get('/api/v1/changes/?since=abc').status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_review_changes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        cursor = client.get('/api/v1/changes/').json()['cursor']
+        response = admin_client.post(f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+                                     data={'text': 'Хорошо', 'score': 8})
+        review_id = response.json()['id']
+        results = client.get(f'/api/v1/changes/?since={cursor}').json()['results']
+        changes = {(item['model'], item['id']): item for item in results}
+        review = changes[('review', review_id)]
+        assert review['action'] == 'created'
+        assert review['data']['title'] == titles[0]['id']
+        assert review['data']['score'] == 8
+        assert changes[('title', titles[0]['id'])]['data']['rating'] == 8, (
+            'Проверьте, что новый отзыв отмечает произведение измененным'
+        )
@@ -0,0 +1,66 @@
+import csv
+import json
+from io import StringIO
+
+import pytest
+
+from .common import auth_client, create_reviews
+
+
+def content(response):
+    return b''.join(response.streaming_content).decode()
+
+
+class Test14ExportAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_export_titles(self, client, admin_client, admin, settings):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        assert client.get('/api/v1/export/titles/').status_code == 401, (
+            'Проверьте, что выгрузка недоступна без токена'
+        )
+        settings.EXPORT_BATCH_SIZE = 1
+        response = admin_client.get('/api/v1/export/titles/')
+        assert response.status_code == 200
+        assert response.streaming, 'Проверьте, что выгрузка отдается потоком'
+        assert response['Content-Type'] == 'application/x-ndjson'
+        rows = [json.loads(line) for line in content(response).splitlines()]
+        expected = [admin_client.get(f'/api/v1/titles/{title["id"]}/').json()
+                    for title in titles]
+        for data in expected:
+            data.pop('scores')
+        assert rows == expected, (
+            'Проверьте, что строки NDJSON совпадают с `GET /api/v1/titles/{id}/`'
+        )
+
+        response = admin_client.get('/api/v1/export/titles/?output=csv')
+        assert response['Content-Type'] == 'text/csv; charset=utf-8'
+        rows = list(csv.DictReader(StringIO(content(response))))
+        assert [row['id'] for row in rows] == [str(title['id']) for title in titles]
+        assert rows[0]['genre'] == 'comedy,horror'
+        assert rows[0]['category'] == 'films'
+        assert rows[0]['rating'] == '4'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_export_reviews(self, admin_client, admin, settings,
+                               django_assert_num_queries):
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        settings.EXPORT_BATCH_SIZE = 2
+        response = admin_client.get('/api/v1/export/reviews/?output=csv')
+        with django_assert_num_queries(2):
+            rows = list(csv.DictReader(StringIO(content(response))))
+        assert [(int(row['id']), row['author'], int(row['score'])) for row in rows] == [
+            (review['id'], review['author'], review['score']) for review in reviews
+        ]
+        assert rows[0]['title'] == str(titles[0]['id'])
+
+        response = admin_client.get('/api/v1/export/reviews/')
+        first = json.loads(content(response).splitlines()[0])
+        assert first == {**admin_client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/').json(),
+            'title': titles[0]['id']}
+        assert admin_client.get('/api/v1/export/reviews/?output=xml').status_code == 400
+        assert admin_client.get('/api/v1/export/users/').status_code == 404
+        assert auth_client(user).get('/api/v1/export/reviews/').status_code == 403, (
+            'Проверьте, что выгрузка доступна только администратору'
+        )
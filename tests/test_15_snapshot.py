@@ -0,0 +1,92 @@
+import gzip
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+from .common import create_comments
+
+
+def index_names():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('index', 'trigger') "
+                       "AND sql IS NOT NULL")
+        return {row[0] for row in cursor.fetchall()}
+
+
+class Test15SnapshotAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_snapshot_restore(self, admin_client, admin, django_user_model, tmp_path):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        reviews_url = f'{title_url}reviews/'
+        expected = {url: admin_client.get(url).json() for url in (
+            '/api/v1/titles/', title_url, reviews_url,
+            f'{reviews_url}{reviews[0]["id"]}/comments/', '/api/v1/users/',
+        )}
+        indexes = index_names()
+        path = str(tmp_path / 'snapshot.jsonl.gz')
+        out = StringIO()
+        call_command('snapshot', path, '--batch-size', '2', stdout=out)
+        assert 'reviews_review: 3 строк' in out.getvalue(), (
+            'Проверьте, что команда snapshot выводит время по таблицам'
+        )
+        with gzip.open(path, 'rt', encoding='utf-8') as stream:
+            assert 'users_outgoingemail' not in stream.read(), (
+                'Проверьте, что очередь писем не попадает в снимок'
+            )
+
+        admin_client.delete(f'/api/v1/titles/{titles[1]["id"]}/')
+        admin_client.patch(title_url, data={'name': 'Другое'})
+        django_user_model.objects.create(username='extra', email='extra@yamdb.fake')
+
+        out = StringIO()
+        call_command('restore_snapshot', path, stdout=out)
+        assert 'Снимок восстановлен' in out.getvalue()
+        for url, data in expected.items():
+            assert admin_client.get(url).json() == data, (
+                f'Проверьте, что после восстановления `{url}` возвращает данные снимка'
+            )
+        assert index_names() == indexes, (
+            'Проверьте, что индексы и триггеры созданы после загрузки'
+        )
+        from reviews.search import title_index_available
+        assert title_index_available()
+        response = admin_client.get('/api/v1/titles/?q=туда')
+        assert [title['id'] for title in response.json()['results']] == [titles[0]['id']], (
+            'Проверьте, что полнотекстовый индекс перестроен'
+        )
+        response = admin_client.post(reviews_url, data={'text': 'Еще', 'score': 7})
+        assert response.status_code == 400, (
+            'Проверьте, что уникальные ограничения действуют после восстановления'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_restore_invalid(self, tmp_path):
+        path = tmp_path / 'broken.jsonl.gz'
+        with gzip.open(path, 'wt', encoding='utf-8') as stream:
+            stream.write('{"format": "other"}\n')
+        with pytest.raises(CommandError):
+            call_command('restore_snapshot', str(path), stdout=StringIO())
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_restore_clears_dependent_tables(self, admin, django_user_model,
+                                                tmp_path):
+        from django.contrib.admin.models import ADDITION, LogEntry
+        from django.contrib.auth.models import Group
+
+        path = str(tmp_path / 'snapshot.jsonl.gz')
+        call_command('snapshot', path, stdout=StringIO())
+        user = django_user_model.objects.create(
+            username='newcomer', email='newcomer@yamdb.fake')
+        user.groups.add(Group.objects.create(name='editors'))
+        LogEntry.objects.log_action(user.pk, None, None, 'newcomer', ADDITION)
+        call_command('restore_snapshot', path, stdout=StringIO())
+        assert not django_user_model.objects.filter(username='newcomer').exists()
+        assert not LogEntry.objects.exists(), (
+            'Проверьте, что восстановление очищает таблицы вне снимка, '
+            'ссылающиеся на пользователей'
+        )
+        assert Group.objects.filter(name='editors').exists()
@@ -0,0 +1,46 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+def write_csv(path, name, lines):
+    (path / name).write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+class Test16LoadCsv:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_load_csv_conflicts(self, tmp_path):
+        from reviews.models import Review, Title
+        from users.models import User
+
+        write_csv(tmp_path, 'users.csv', [
+            'id,username,email,role,bio,first_name,last_name',
+            '101,reader,reader@yamdb.fake,user,,,',
+            '102,reader,copy@yamdb.fake,user,,,',
+        ])
+        write_csv(tmp_path, 'category.csv', ['id,name,slug', '1,Книги,books'])
+        write_csv(tmp_path, 'titles.csv', ['id,name,year,category', '1,Роман,2000,1'])
+        write_csv(tmp_path, 'review.csv', [
+            'id,title_id,text,author,score,pub_date',
+            '1,1,Хорошо,101,8,2020-01-01T00:00:00Z',
+            '2,1,Плохо,102,2,2020-01-02T00:00:00Z',
+        ])
+        out = StringIO()
+        call_command('load_csv', '--path', str(tmp_path), stdout=out)
+        output = out.getvalue()
+        assert 'users.csv: 1 строк' in output and 'пропущено: 1' in output, (
+            'Проверьте, что строки, пропущенные из-за конфликта, не считаются загруженными'
+        )
+        assert list(User.objects.values_list('id', flat=True)) == [101]
+        assert list(Review.objects.values_list('id', flat=True)) == [1], (
+            'Проверьте, что отзывы пропущенного пользователя не загружаются'
+        )
+        assert Title.objects.get().rating == 8
+
+        out = StringIO()
+        call_command('load_csv', '--path', str(tmp_path), stdout=out)
+        assert 'users.csv: 0 строк' in out.getvalue(), (
+            'Проверьте, что повторная загрузка не считает существующие строки'
+        )